@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+DIST_DIR = STATIC_DIR / "dist"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Build order matters: text assets may reference earlier entries by their
+# logical path ("/static/fonts/x.woff2") and get the hashed URL swapped in.
+SOURCES = [
+    "fonts/source-sans-3.woff2",
+    "fonts/source-serif-4.woff2",
+    "fonts/source-serif-4-italic.woff2",
+    "report.css",
+    "search-worker.js",
+    "report.js",
+]
+TEXT_TYPES = (".css", ".js", ".svg", ".json")
+MEDIA_TYPES = {".woff2": "font/woff2", ".js": "text/javascript; charset=utf-8", ".css": "text/css; charset=utf-8"}
+
+manifest = {}  # logical path -> hashed file name
+files = {}     # hashed file name -> {"media_type", "identity", "gzip", "br"}
+
+
+def _write(path, blob):
+    if not path.exists():
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+
+
+def build():
+    """Write content-hashed (and pre-compressed) copies of SOURCES to DIST_DIR."""
+    DIST_DIR.mkdir(exist_ok=True)
+    for logical in SOURCES:
+        src = STATIC_DIR / logical
+        blob = src.read_bytes()
+        if src.suffix in TEXT_TYPES:
+            text = blob.decode("utf-8")
+            for dep, hashed in manifest.items():
+                text = text.replace(f"/static/{dep}", f"/static/{hashed}")
+            blob = text.encode("utf-8")
+        digest = hashlib.sha256(blob).hexdigest()[:12]
+        name = f"{Path(logical).stem}.{digest}{src.suffix}"
+        entry = {
+            "media_type": MEDIA_TYPES.get(src.suffix) or mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "identity": DIST_DIR / name,
+        }
+        _write(entry["identity"], blob)
+        if src.suffix in TEXT_TYPES:
+            entry["gzip"] = DIST_DIR / (name + ".gz")
+            _write(entry["gzip"], gzip.compress(blob, 9, mtime=0))
+            if brotli is not None:
+                entry["br"] = DIST_DIR / (name + ".br")
+                _write(entry["br"], brotli.compress(blob, quality=11))
+        manifest[logical] = name
+        files[name] = entry
+
+
+def url(logical):
+    return f"/static/{manifest[logical]}"
+
+
+def pick(name, accept_encoding):
+    """Return (path, content_encoding, media_type) for a hashed asset, or None."""
+    entry = files.get(name)
+    if entry is None:
+        return None
+    accepted = {e.split(";")[0].strip() for e in (accept_encoding or "").split(",")}
+    for enc in ("br", "gzip"):
+        if enc in entry and enc in accepted:
+            return entry[enc], enc, entry["media_type"]
+    return entry["identity"], None, entry["media_type"]
+
+
+build()
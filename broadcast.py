@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from itertools import islice
+
+from starlette.responses import StreamingResponse
+
+BUFFER_EVENTS = int(os.environ.get("STREAM_BUFFER_EVENTS", "256"))
+MAX_SUBSCRIBERS = int(os.environ.get("STREAM_MAX_SUBSCRIBERS", "200"))
+HEARTBEAT_SECONDS = 15
+
+
+class Broadcast:
+    """Shared ring buffer of pre-encoded SSE frames for one session.
+
+    Publishing encodes the frame once no matter how many viewers are
+    connected; each subscriber only keeps a cursor into the buffer. A
+    subscriber that falls more than BUFFER_EVENTS behind gets a "reset"
+    frame and is moved to the head instead of holding the buffer back.
+    """
+
+    def __init__(self, maxlen=BUFFER_EVENTS):
+        self.frames = deque(maxlen=maxlen)
+        self.next_seq = 0
+        self.subscribers = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self._waiters = []
+
+    def publish(self, event, data):
+        with self._lock:
+            seq = self.next_seq
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+            self.frames.append((seq, f"id: {seq}\nevent: {event}\ndata: {body}\n\n".encode("utf-8")))
+            self.next_seq += 1
+        self._wake_all()
+        return seq
+
+    def close(self):
+        """Mark the session gone; subscribers finish their stream."""
+        with self._lock:
+            self.closed = True
+        self._wake_all()
+
+    def _wake_all(self):
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_wake, fut)
+
+    def read(self, cursor):
+        """Return (frames, new_cursor, lagged) for everything at or after cursor."""
+        with self._lock:
+            if not self.frames or cursor >= self.next_seq:
+                return [], cursor, False
+            oldest = self.frames[0][0]
+            if cursor < oldest:
+                return [], self.next_seq, True
+            frames = [f for _, f in islice(self.frames, cursor - oldest, None)]
+            return frames, self.next_seq, False
+
+    async def wait(self, cursor, timeout):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            if cursor < self.next_seq or self.closed:
+                return
+            self._waiters.append((loop, fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if (loop, fut) in self._waiters:
+                    self._waiters.remove((loop, fut))
+
+
+def _wake(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+channels = {}
+_channels_lock = threading.Lock()
+
+
+def channel(session_id):
+    with _channels_lock:
+        ch = channels.get(session_id)
+        if ch is None:
+            ch = channels[session_id] = Broadcast()
+        return ch
+
+
+def drop(session_id):
+    with _channels_lock:
+        ch = channels.pop(session_id, None)
+    if ch is not None:
+        ch.close()
+
+
+class Subscription:
+    """One reserved subscriber slot; release() is safe to call twice."""
+
+    def __init__(self, ch):
+        self.channel = ch
+        self._released = False
+
+    def release(self):
+        with self.channel._lock:
+            if not self._released:
+                self._released = True
+                self.channel.subscribers -= 1
+
+
+def reserve(ch):
+    with ch._lock:
+        if ch.subscribers >= MAX_SUBSCRIBERS:
+            return None
+        ch.subscribers += 1
+        return Subscription(ch)
+
+
+async def subscribe(sub, cursor):
+    """Yield SSE frames from cursor on until the channel is closed."""
+    ch = sub.channel
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            frames, cursor, lagged = ch.read(cursor)
+            if lagged:
+                yield f"id: {cursor - 1}\nevent: reset\ndata: {{}}\n\n".encode()
+            for f in frames:
+                yield f
+            if ch.closed:
+                yield b"event: closed\ndata: {}\n\n"
+                return
+            if not frames and not lagged:
+                before = ch.next_seq
+                await ch.wait(cursor, HEARTBEAT_SECONDS)
+                if ch.next_seq == before and not ch.closed:
+                    yield b": ping\n\n"
+    finally:
+        sub.release()
+
+
+class SubscriptionResponse(StreamingResponse):
+    """SSE response that frees its slot however it ends.
+
+    The generator's finally never runs if the client leaves before the
+    first chunk, so the slot is also released when the response closes.
+    """
+
+    def __init__(self, sub, cursor, headers=None):
+        super().__init__(subscribe(sub, cursor), media_type="text/event-stream", headers=headers)
+        self.subscription = sub
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.subscription.release()
@@ -0,0 +1,159 @@
+import bisect
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.request
+
+# Session ids are SHARD_HEX hex chars of shard key followed by random hex.
+# The shard key is what the hash ring places, so any node can tell which
+# node owns a session just by looking at its id.
+SHARD_HEX = 4
+SESSION_ID_LEN = 16
+VNODES = 64
+
+NODE_ID = os.environ.get("NODE_ID", "local")
+CLUSTER_SECRET = os.environ.get("CLUSTER_SECRET", "")
+# How long a starting node keeps retrying peers that are not up yet.
+ANNOUNCE_SECONDS = float(os.environ.get("CLUSTER_ANNOUNCE_SECONDS", "30"))
+
+
+def parse_nodes(spec):
+    """Parse "a=http://127.0.0.1:8001,b=http://127.0.0.1:8002" into a dict."""
+    nodes = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        node_id, _, url = part.partition("=")
+        nodes[node_id.strip()] = url.strip().rstrip("/")
+    return nodes
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, nodes=None, vnodes=VNODES):
+        self.vnodes = vnodes
+        self.nodes = {}
+        self._points = []
+        self._owners = []
+        self._lock = threading.Lock()
+        for node_id, url in (nodes or {}).items():
+            self.add(node_id, url)
+
+    def _rebuild(self):
+        ring = sorted(
+            (_hash(f"{node_id}#{i}"), node_id)
+            for node_id in self.nodes
+            for i in range(self.vnodes)
+        )
+        self._points = [p for p, _ in ring]
+        self._owners = [n for _, n in ring]
+
+    def add(self, node_id, url):
+        with self._lock:
+            known = self.nodes.get(node_id) == url
+            self.nodes[node_id] = url
+            if not known:
+                self._rebuild()
+            return not known
+
+    def remove(self, node_id):
+        with self._lock:
+            if self.nodes.pop(node_id, None) is not None:
+                self._rebuild()
+
+    def owner(self, shard):
+        if not self._points:
+            return NODE_ID
+        i = bisect.bisect(self._points, _hash(shard)) % len(self._points)
+        return self._owners[i]
+
+    def url(self, node_id):
+        return self.nodes.get(node_id)
+
+
+# CLUSTER_NODES lists the nodes allowed in the cluster. The ring only holds
+# the live ones: it starts with this node, and peers are added as they
+# announce themselves (or answer this node's announcement), which is what
+# moves sessions to them.
+CONFIGURED = parse_nodes(os.environ.get("CLUSTER_NODES", ""))
+ring = HashRing({NODE_ID: CONFIGURED[NODE_ID]} if NODE_ID in CONFIGURED else CONFIGURED)
+
+# /cluster/* can move every session to whoever calls it, so it only exists
+# when nodes are configured and requests can be authenticated.
+ENABLED = bool(CONFIGURED) and bool(CLUSTER_SECRET)
+
+
+def shard_of(session_id):
+    return session_id[:SHARD_HEX]
+
+
+def owner_of(session_id):
+    return ring.owner(shard_of(session_id))
+
+
+def is_clustered():
+    return len(ring.nodes) > 1
+
+
+if len(CONFIGURED) > 1 and NODE_ID not in CONFIGURED:
+    # new_session_id() would never find a shard owned by this node.
+    raise RuntimeError(f"NODE_ID={NODE_ID!r} is not one of CLUSTER_NODES ({', '.join(CONFIGURED)})")
+
+
+def is_member(node_id, url):
+    """True if node_id is configured in CLUSTER_NODES with this url."""
+    return CONFIGURED.get(node_id) == url.rstrip("/")
+
+
+def new_session_id():
+    # Draw shard keys until one lands on this node; with N nodes that takes
+    # N tries on average.
+    rest = (SESSION_ID_LEN - SHARD_HEX) // 2
+    while True:
+        shard = secrets.token_hex(SHARD_HEX // 2)
+        if not is_clustered() or ring.owner(shard) == NODE_ID:
+            return shard + secrets.token_hex(rest)
+
+
+def post_json(url, payload, timeout=10):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    req = urllib.request.Request(url, data=body, method="POST")
+    req.add_header("Content-Type", "application/json")
+    if CLUSTER_SECRET:
+        req.add_header("X-Cluster-Secret", CLUSTER_SECRET)
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read() or b"null")
+
+
+def announce(on_join):
+    """Join every configured peer that is up.
+
+    Each peer that answers adds this node to its ring (handing over the
+    sessions that now belong here) and is added to this node's ring in
+    turn, after which on_join() hands over ours. Peers that are down are
+    retried for ANNOUNCE_SECONDS; a peer that starts later announces itself.
+    """
+    me = CONFIGURED.get(NODE_ID)
+    if not ENABLED or not me:
+        return
+    waiting = {n: u for n, u in CONFIGURED.items() if n != NODE_ID}
+    deadline = time.time() + ANNOUNCE_SECONDS
+    while waiting:
+        for node_id, url in list(waiting.items()):
+            try:
+                post_json(f"{url}/cluster/join", {"node_id": NODE_ID, "url": me})
+            except OSError:
+                continue
+            del waiting[node_id]
+            if ring.add(node_id, url):
+                on_join()
+        if not waiting or time.time() >= deadline:
+            break
+        time.sleep(1)
@@ -0,0 +1,53 @@
+import threading
+
+import news
+
+
+class Signature:
+    """Per-item identity hash -> (index, hypothesis) for one session."""
+
+    def __init__(self):
+        self.items = {}
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def extend(self, items):
+        with self._lock:
+            for i, n in enumerate(items, self.size):
+                if isinstance(n, dict):
+                    self.items.setdefault(news.identity(n), (i, news.hypothesis(n)))
+            self.size += len(items)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.items)
+
+
+signatures = {}
+
+
+def build(session_id, items):
+    sig = Signature()
+    sig.extend(items)
+    signatures[session_id] = sig
+    return sig
+
+
+def drop(session_id):
+    signatures.pop(session_id, None)
+
+
+def compare(old, new):
+    """Added/removed/reclassified between two signatures, linear in their size."""
+    # Appends may extend either signature meanwhile; compare copies.
+    old, new = old.snapshot(), new.snapshot()
+    old_keys, new_keys = old.keys(), new.keys()
+    added = sorted(new[k][0] for k in new_keys - old_keys)
+    removed = sorted(old[k][0] for k in old_keys - new_keys)
+    reclassified = []
+    for k in new_keys & old_keys:
+        (i, to), (_, frm) = new[k], old[k]
+        if to != frm:
+            reclassified.append({"index": i, "from": frm, "to": to})
+    reclassified.sort(key=lambda r: r["index"])
+    return {"added": added, "removed": removed, "reclassified": reclassified}
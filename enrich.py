@@ -0,0 +1,212 @@
+import asyncio
+import ipaddress
+import os
+import socket
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+ENABLED = os.environ.get("ENRICH_LINKS", "") == "1" and httpx is not None
+MAX_CONNECTIONS = int(os.environ.get("ENRICH_MAX_CONNECTIONS", "32"))
+PER_HOST = int(os.environ.get("ENRICH_PER_HOST", "4"))
+TIMEOUT_SECONDS = float(os.environ.get("ENRICH_TIMEOUT_SECONDS", "8"))
+CACHE_TTL_SECONDS = int(os.environ.get("ENRICH_CACHE_TTL_SECONDS", "21600"))
+# Threads waiting on link crawls, apart from the shared job workers.
+WORKERS = int(os.environ.get("ENRICH_WORKERS", "2"))
+# Links come from report payloads, so by default only public addresses are
+# fetched. ENRICH_ALLOW_PRIVATE=1 lifts that for local testing.
+ALLOW_PRIVATE = os.environ.get("ENRICH_ALLOW_PRIVATE", "") == "1"
+MAX_REDIRECTS = 5
+MAX_BODY_BYTES = 128 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; VigilanciaProspectiva/1.0)"
+
+
+def hostname(url):
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class BlockedURL(Exception):
+    """Not an http(s) URL, or its host resolves to a non-public address."""
+
+
+class _EndOfHead(Exception):
+    pass
+
+
+class _MetaParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.canonical = None
+        self._in_title = False
+        self._title = []
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = a.get("property") or a.get("name") or ""
+            if key.startswith("og:") and a.get("content"):
+                self.meta.setdefault(key[3:], a["content"].strip())
+        elif tag == "link" and "canonical" in (a.get("rel") or "").split() and a.get("href"):
+            self.canonical = a["href"]
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            raise _EndOfHead
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title.append(data)
+
+    @property
+    def title(self):
+        return " ".join("".join(self._title).split()) or None
+
+
+def parse_html(url, text):
+    p = _MetaParser()
+    try:
+        p.feed(text)
+    except _EndOfHead:
+        pass
+    canonical = urljoin(url, p.meta.get("url") or p.canonical or url)
+    return {
+        "canonical": canonical,
+        "title": p.meta.get("title") or p.title,
+        "description": p.meta.get("description"),
+        "site_name": p.meta.get("site_name"),
+        "image": p.meta.get("image"),
+    }
+
+
+class Enricher:
+    """Pooled async link resolver shared by every session.
+
+    One httpx client (and its connection pool) lives on a dedicated event
+    loop thread; lookups are limited per host and cached for
+    CACHE_TTL_SECONDS across sessions. Redirects are followed by hand so
+    every hop is checked against non-public addresses.
+    """
+
+    def __init__(self, transport=None, allow_private=ALLOW_PRIVATE):
+        self._transport = transport
+        self.allow_private = allow_private
+        self._loop = None
+        self._client = None
+        self._hosts = {}
+        self._cache = {}
+        self._start_lock = threading.Lock()
+        self.stats = {"fetched": 0, "cache_hits": 0, "errors": 0}
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="enrich", daemon=True).start()
+        return self._loop
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=False,
+                timeout=TIMEOUT_SECONDS,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _host_limit(self, host):
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(PER_HOST)
+        return sem
+
+    async def _addresses(self, host, port):
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return {info[4][0] for info in infos}
+
+    async def _check(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise BlockedURL(url)
+        if self.allow_private:
+            return
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        for addr in await self._addresses(parts.hostname, port):
+            ip = ipaddress.ip_address(addr)
+            if not ip.is_global or ip.is_multicast:
+                raise BlockedURL(url)
+
+    async def _fetch(self, url, result):
+        client = self._get_client()
+        for _ in range(MAX_REDIRECTS + 1):
+            await self._check(url)
+            async with client.stream("GET", url) as resp:
+                if resp.has_redirect_location and resp.next_request is not None:
+                    url = str(resp.next_request.url)
+                    continue
+                result["status"] = resp.status_code
+                result["ok"] = resp.is_success
+                final = str(resp.url)
+                result["canonical"] = final
+                result["host"] = hostname(final)
+                if resp.is_success and "html" in resp.headers.get("content-type", ""):
+                    body = b""
+                    async for chunk in resp.aiter_bytes():
+                        body += chunk
+                        if len(body) >= MAX_BODY_BYTES:
+                            break
+                    meta = parse_html(final, body.decode(resp.encoding or "utf-8", errors="replace"))
+                    result.update({k: v for k, v in meta.items() if v})
+                    result["host"] = hostname(result["canonical"])
+                return
+        raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=resp.request)
+
+    async def resolve(self, url):
+        now = time.time()
+        hit = self._cache.get(url)
+        if hit and hit[0] > now:
+            self.stats["cache_hits"] += 1
+            return hit[1]
+        result = {"url": url, "canonical": url, "host": "", "ok": False, "status": None}
+        try:
+            # urlsplit raises ValueError on malformed links such as "http://[".
+            result["host"] = hostname(url)
+            async with self._host_limit(urlsplit(url).hostname or ""):
+                await self._fetch(url, result)
+            self.stats["fetched"] += 1
+        except (httpx.HTTPError, httpx.InvalidURL, BlockedURL, OSError, ValueError) as e:
+            result["error"] = type(e).__name__
+            self.stats["errors"] += 1
+        self._cache[url] = (time.time() + CACHE_TTL_SECONDS, result)
+        return result
+
+    async def resolve_all(self, urls):
+        self.expire_cache()
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.resolve(u) for u in unique))
+        return dict(zip(unique, results))
+
+    def submit(self, urls):
+        """Resolve urls on the enrich loop; returns a future of {url: result}."""
+        return asyncio.run_coroutine_threadsafe(self.resolve_all(urls), self._ensure_loop())
+
+    def expire_cache(self):
+        now = time.time()
+        for url in [u for u, (exp, _) in self._cache.items() if exp <= now]:
+            self._cache.pop(url, None)
+
+
+enricher = Enricher()
@@ -0,0 +1,105 @@
+import threading
+
+import news
+
+# facet name -> how to read it from a news item.
+FIELDS = {
+    "hipotesis": news.hypothesis,
+    "fuente": lambda n: news.get(n, "source"),
+    "pais": lambda n: news.get(n, "country"),
+}
+
+
+class FacetIndex:
+    """One bitset (a Python int) per facet value; bit i is item i."""
+
+    def __init__(self):
+        self.size = 0
+        self.bits = {f: {} for f in FIELDS}
+        self._lock = threading.Lock()
+
+    def extend(self, items):
+        positions = {f: {} for f in FIELDS}
+        for i, n in enumerate(items, self.size):
+            if not isinstance(n, dict):
+                continue
+            for f, get in FIELDS.items():
+                v = get(n)
+                if v:
+                    positions[f].setdefault(v, []).append(i)
+        with self._lock:
+            for f, values in positions.items():
+                bits = self.bits[f]
+                for v, pos in values.items():
+                    bits[v] = bits.get(v, 0) | _bitset(pos)
+            self.size += len(items)
+
+    def _masks(self, filters):
+        masks = {}
+        for f, wanted in filters.items():
+            m = 0
+            for v in wanted:
+                m |= self.bits[f].get(v, 0)
+            masks[f] = m
+        return masks
+
+    def select(self, filters):
+        """Bitset of the items matching every facet filter."""
+        m = (1 << self.size) - 1
+        for mask in self._masks(filters).values():
+            m &= mask
+        return m
+
+    def counts(self, filters):
+        """Counts for every facet value under the other facets' filters.
+
+        filters maps a facet to the set of accepted values (OR within a
+        facet, AND across facets). Each facet is counted against the mask of
+        the other facets so its options show what selecting them would give.
+        """
+        everything = (1 << self.size) - 1
+        masks = self._masks(filters)
+        total = everything
+        for m in masks.values():
+            total &= m
+        out = {}
+        for f, values in self.bits.items():
+            others = everything
+            for g, m in masks.items():
+                if g != f:
+                    others &= m
+            out[f] = {v: (b & others).bit_count() for v, b in values.items()}
+        return {"total": total.bit_count(), "size": self.size, "facets": out}
+
+
+def _bitset(positions):
+    # Set bits in a bytearray and convert once; OR-ing 1 << i into a growing
+    # int would copy the whole int for every item.
+    buf = bytearray((positions[-1] >> 3) + 1)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def positions(bits):
+    """Indices of the set bits of a bitset, ascending."""
+    digits = bin(bits)[:1:-1]  # least significant bit first, "0b" dropped
+    out, i = [], digits.find("1")
+    while i != -1:
+        out.append(i)
+        i = digits.find("1", i + 1)
+    return out
+
+
+indexes = {}
+
+
+def build(session_id, items):
+    idx = FacetIndex()
+    idx.extend(items)
+    indexes[session_id] = idx
+    return idx
+
+
+def drop(session_id):
+    indexes.pop(session_id, None)
@@ -0,0 +1,103 @@
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+COLUMNAR = "application/vnd.vigilancia.columnar+json"
+MSGPACK = "application/msgpack"
+
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+
+# Low-cardinality columns stored as indices into one shared string table.
+DICT_FIELDS = ("Fuente", "País", "Hipotesis")
+
+
+def available():
+    offers = [JSON, COLUMNAR]
+    if msgpack is not None:
+        offers.append(MSGPACK)
+    return offers
+
+
+def negotiate(accept, fmt=None):
+    """Pick the best media type for an Accept header (or ?format= override).
+
+    Only an unknown ?format= gives None (406). An Accept header that names
+    nothing we offer still gets JSON, as every client did before
+    negotiation existed.
+    """
+    offers = available()
+    if fmt:
+        wanted = {"json": JSON, "columnar": COLUMNAR, "msgpack": MSGPACK}.get(fmt)
+        return wanted if wanted in offers else None
+    if not accept:
+        return JSON
+    ranked = []
+    for i, part in enumerate(accept.split(",")):
+        media, _, params = part.strip().partition(";")
+        media = _ALIASES.get(media.strip().lower(), media.strip().lower())
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, i, media))
+    for neg_q, _, media in sorted(ranked):
+        if neg_q == 0:
+            break
+        if media in offers:
+            return media
+        if media in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+def to_columnar(data):
+    """Rewrite data["noticias"] as one array per field.
+
+    Keys missing from an item become null, and the decoder drops nulls, so
+    the round trip is exact except for explicit null values.
+    """
+    items = data.get("noticias") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not all(isinstance(n, dict) for n in items):
+        return data
+    fields = {}
+    for n in items:
+        for k in n:
+            fields.setdefault(k, None)
+    columns = {f: [n.get(f) for n in items] for f in fields}
+
+    strings, index, encoded = [], {}, []
+    for f in DICT_FIELDS:
+        col = columns.get(f)
+        if col is None or not all(v is None or isinstance(v, str) for v in col):
+            continue
+        for i, v in enumerate(col):
+            if v is not None:
+                j = index.get(v)
+                if j is None:
+                    j = index[v] = len(strings)
+                    strings.append(v)
+                col[i] = j
+        encoded.append(f)
+
+    return {
+        **data,
+        "format": "columnar",
+        "noticias": {
+            "length": len(items),
+            "fields": list(fields),
+            "columns": columns,
+            "strings": strings,
+            "encoded": encoded,
+        },
+    }
+
+
+def to_msgpack(data):
+    return msgpack.packb(data, use_bin_type=True)
+
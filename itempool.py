@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import threading
+
+ENABLED = os.environ.get("ITEM_POOL", "1") == "1"
+KEY_BYTES = 16
+
+
+def content_key(n):
+    raw = json.dumps(n, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class ItemPool:
+    """One shared dict per distinct news item, reference-counted by session.
+
+    Sessions keep their items as references to the pooled dicts plus a
+    packed bytearray of content keys (KEY_BYTES per item) used to release
+    them. Pooled dicts are shared and may be read by other threads, so
+    they are never changed in place: annotations go on copies, swapped in
+    with store.replace_items() or kept per session.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._lock = threading.Lock()
+        self.references = 0
+
+    def acquire(self, items):
+        """Canonical items and their packed keys; non-dict items pass through."""
+        keys = [content_key(n) if isinstance(n, dict) else None for n in items]
+        out, packed = [], bytearray()
+        with self._lock:
+            for n, k in zip(items, keys):
+                if k is None:
+                    out.append(n)
+                    packed += bytes(KEY_BYTES)
+                    continue
+                entry = self._items.get(k)
+                if entry is None:
+                    entry = self._items[k] = [n, 0]
+                entry[1] += 1
+                self.references += 1
+                out.append(entry[0])
+                packed += k
+        return out, packed
+
+    def release(self, packed):
+        empty = bytes(KEY_BYTES)
+        with self._lock:
+            for i in range(0, len(packed), KEY_BYTES):
+                k = bytes(packed[i:i + KEY_BYTES])
+                if k == empty:
+                    continue
+                entry = self._items.get(k)
+                if entry is None:
+                    continue
+                entry[1] -= 1
+                self.references -= 1
+                if entry[1] <= 0:
+                    del self._items[k]
+
+    def stats(self):
+        with self._lock:
+            unique = len(self._items)
+            return {
+                "enabled": ENABLED,
+                "unique_items": unique,
+                "references": self.references,
+                "shared_references": self.references - unique,
+            }
+
+
+pool = ItemPool()
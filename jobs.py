@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+
+
+class JobQueue:
+    """In-process post-processing queue.
+
+    Stages run in registration order on a worker pool, once per session,
+    after the raw payload has been stored. A stage added with its own
+    workers (slow network I/O) runs on a separate pool instead, so it does
+    not hold a shared worker while other sessions wait. Status is kept per
+    session and per stage so callers can tell what is ready.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._lock = threading.Lock()
+        self.stages = []
+        self.status = {}
+        self.pending = 0
+
+    def add_stage(self, name, fn, workers=None):
+        pool = None
+        if workers:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"jobs-{name}")
+        self.stages.append((name, fn, pool))
+
+    def submit(self, session_id, data):
+        with self._lock:
+            self.status[session_id] = {
+                "state": "pending",
+                "stages": {name: "pending" for name, _, _ in self.stages},
+                "queued_at": time.time(),
+            }
+            self.pending += 1
+        self._pool.submit(self._run, session_id, data)
+
+    def run(self, fn, *args):
+        """Run a one-off background task on the same pool."""
+        return self._pool.submit(self._task, fn, *args)
+
+    def _task(self, fn, *args):
+        # Nobody waits on these futures, so report failures here.
+        try:
+            return fn(*args)
+        except Exception:
+            traceback.print_exc()
+            raise
+
+    def _run(self, session_id, data):
+        st = self.status.get(session_id)
+        try:
+            if st is None:
+                return
+            with self._lock:
+                st["state"] = "running"
+            for name, fn, pool in self.stages:
+                if self.status.get(session_id) is not st:
+                    return  # session expired or was evicted meanwhile
+                if pool is not None:
+                    with self._lock:
+                        self.pending += 1
+                    pool.submit(self._detached, session_id, st, name, fn, data)
+                    continue
+                self._stage(st, name, fn, session_id, data)
+            self._finish(st)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _detached(self, session_id, st, name, fn, data):
+        try:
+            if self.status.get(session_id) is st:
+                self._stage(st, name, fn, session_id, data)
+                self._finish(st)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _stage(self, st, name, fn, session_id, data):
+        with self._lock:
+            st["stages"][name] = "running"
+        try:
+            fn(session_id, data)
+        except Exception as e:
+            with self._lock:
+                st["stages"][name] = "failed"
+                st.setdefault("errors", {})[name] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        else:
+            with self._lock:
+                st["stages"][name] = "done"
+
+    def _finish(self, st):
+        # Called after the inline stages and after each detached one; the
+        # last of them to finish settles the session state.
+        with self._lock:
+            if "finished_at" in st or any(v in ("pending", "running") for v in st["stages"].values()):
+                return
+            st["state"] = "failed" if st.get("errors") else "ready"
+            st["finished_at"] = time.time()
+
+    def get(self, session_id):
+        st = self.status.get(session_id)
+        if st is None:
+            return None
+        # Stages update st from worker threads; copy it under the same lock.
+        with self._lock:
+            out = {k: v for k, v in st.items() if k not in ("queued_at", "finished_at")}
+            out["stages"] = dict(st["stages"])
+            if "errors" in st:
+                out["errors"] = dict(st["errors"])
+            if "finished_at" in st:
+                out["seconds"] = round(st["finished_at"] - st["queued_at"], 3)
+        return out
+
+    def drop(self, session_id):
+        self.status.pop(session_id, None)
+
+
+queue = JobQueue()
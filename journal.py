@@ -0,0 +1,229 @@
+import base64
+import glob
+import gzip
+import json
+import os
+import queue
+import random
+import re
+import shutil
+import threading
+import time
+
+PATH = os.environ.get("JOURNAL_PATH", "")
+ENABLED = bool(PATH)
+SAMPLE = float(os.environ.get("JOURNAL_SAMPLE", "1.0"))
+RECORD_BODIES = os.environ.get("JOURNAL_BODIES", "1") == "1"
+BODY_MAX_BYTES = int(os.environ.get("JOURNAL_BODY_MAX_BYTES", str(1 << 20)))
+REDACT_FIELDS = {f.strip() for f in os.environ.get("JOURNAL_REDACT", "").split(",") if f.strip()}
+MAX_BYTES = int(os.environ.get("JOURNAL_MAX_BYTES", str(64 << 20)))
+KEEP = int(os.environ.get("JOURNAL_KEEP", "10"))
+BATCH = int(os.environ.get("JOURNAL_BATCH", "256"))
+FLUSH_SECONDS = float(os.environ.get("JOURNAL_FLUSH_SECONDS", "1.0"))
+QUEUE_MAX = int(os.environ.get("JOURNAL_QUEUE_MAX", "10000"))
+
+# Headers worth replaying; everything else (auth, cookies, cluster secret) is never written.
+KEEP_HEADERS = ("content-type", "accept", "accept-encoding", "last-event-id", "save-data", "ect", "user-agent")
+RESPONSE_PEEK_BYTES = 4096
+SESSION_ID = re.compile(rb'"session_id":\s*"([0-9a-f]{16})"')
+REDACTED = "[redacted]"
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if k in REDACT_FIELDS else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def encode_body(body, truncated):
+    """Body as stored in the journal: parsed JSON, text, or base64, post-redaction."""
+    if truncated:
+        return {"body_truncated": True}
+    if not body:
+        return {}
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        parsed = None
+    else:
+        return {"json": redact(parsed) if REDACT_FIELDS else parsed}
+    if REDACT_FIELDS:
+        return {"body_redacted": True}
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+class Journal:
+    """Sampled request log written by one background thread.
+
+    Handlers only put a tuple on a bounded queue (dropping it when the queue
+    is full); parsing, redaction, JSON encoding, batching, rotation and gzip
+    all happen on the writer thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue(maxsize=QUEUE_MAX)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "dropped": 0, "written": 0, "rotations": 0, "bytes": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                # "{pid}" in JOURNAL_PATH gives each preforked worker its own file.
+                self.path = self.path.replace("{pid}", str(os.getpid()))
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._thread = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+                self._thread.start()
+
+    def record(self, entry):
+        try:
+            self._queue.put_nowait(entry)
+            self.stats["recorded"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def close(self, timeout=5):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _format(self, entry):
+        t, method, path, query, headers, body, truncated, status, ms, ttfb_ms, peek = entry
+        row = {
+            "t": round(t, 4),
+            "method": method,
+            "path": path,
+            "query": query,
+            "headers": headers,
+            "status": status,
+            "ms": round(ms, 2),
+            "ttfb_ms": round(ttfb_ms, 2) if ttfb_ms is not None else None,
+        }
+        row.update(encode_body(body, truncated))
+        ids = [m.decode() for m in SESSION_ID.findall(peek)]
+        if ids:
+            row["session_ids"] = ids
+        return json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _write_loop(self):
+        out = open(self.path, "a", encoding="utf-8")
+        size = out.tell()
+        closing = False
+        while not closing:
+            try:
+                first = self._queue.get(timeout=FLUSH_SECONDS)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                closing = True
+                batch = [e for e in batch if e is not None]
+            lines = []
+            for entry in batch:
+                try:
+                    lines.append(self._format(entry))
+                except Exception:
+                    self.stats["dropped"] += 1
+            chunk = "".join(lines)
+            out.write(chunk)
+            out.flush()
+            size += len(chunk.encode("utf-8"))
+            self.stats["written"] += len(lines)
+            self.stats["bytes"] = size
+            if size >= MAX_BYTES:
+                out.close()
+                self._rotate()
+                out = open(self.path, "a", encoding="utf-8")
+                size = 0
+        out.close()
+
+    def _rotate(self):
+        rotated = f"{self.path}.{time.strftime('%Y%m%dT%H%M%S')}.{int(time.time() * 1000) % 1000:03d}"
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        self.stats["rotations"] += 1
+        for old in sorted(glob.glob(glob.escape(self.path) + ".*.gz"))[:-KEEP or None]:
+            os.remove(old)
+
+
+journal = Journal(PATH)
+
+
+class JournalMiddleware:
+    """ASGI middleware that samples requests into the journal.
+
+    The request body is copied as it streams through (up to
+    BODY_MAX_BYTES) and the first bytes of the response are kept so the
+    writer can pick out session ids created by POSTs for the replay tool.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        journal.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= SAMPLE:
+            await self.app(scope, receive, send)
+            return
+        t0 = time.time()
+        p0 = time.perf_counter()
+        body, size, status, ttfb, peek = [], 0, None, None, []
+
+        async def receive_wrapper():
+            nonlocal size
+            msg = await receive()
+            if RECORD_BODIES and msg["type"] == "http.request":
+                chunk = msg.get("body", b"")
+                if size < BODY_MAX_BYTES:
+                    body.append(chunk[:BODY_MAX_BYTES - size])
+                size += len(chunk)
+            return msg
+
+        async def send_wrapper(msg):
+            nonlocal status, ttfb
+            if msg["type"] == "http.response.start":
+                status = msg["status"]
+                ttfb = (time.perf_counter() - p0) * 1000
+            elif (msg["type"] == "http.response.body" and scope["method"] == "POST"
+                  and sum(map(len, peek)) < RESPONSE_PEEK_BYTES):
+                peek.append(msg.get("body", b"")[:RESPONSE_PEEK_BYTES])
+            await send(msg)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            headers = {}
+            for k, v in scope["headers"]:
+                k = k.decode("latin-1")
+                if k in KEEP_HEADERS:
+                    headers[k] = v.decode("latin-1")
+            query = scope.get("query_string", b"").decode("latin-1")
+            if REDACT_FIELDS and query:
+                query = "&".join(
+                    f"{k}={REDACTED}" if k in REDACT_FIELDS else p
+                    for p in query.split("&")
+                    for k in [p.partition("=")[0]]
+                )
+            journal.record((
+                t0, scope["method"], scope["path"], query, headers,
+                b"".join(body), size > BODY_MAX_BYTES, status,
+                (time.perf_counter() - p0) * 1000, ttfb, b"".join(peek),
+            ))
+
+
+def stats():
+    return {"enabled": ENABLED, "sample": SAMPLE, **journal.stats}
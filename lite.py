@@ -0,0 +1,105 @@
+import os
+from html import escape
+
+import news
+
+PAGE_SIZE = int(os.environ.get("LITE_PAGE_SIZE", "20"))
+BYTE_BUDGET = int(os.environ.get("LITE_BYTE_BUDGET", str(14 * 1024)))
+TEXT_MAX = 280
+SLOW_ECT = ("slow-2g", "2g", "3g")
+
+# System fonts only, no external requests.
+CSS = """
+body{margin:0;font:15px/1.45 system-ui,-apple-system,"Segoe UI",Roboto,sans-serif;color:#1a1a1a;background:#f7f5f0}
+header{background:#0d1b2a;color:#fff;padding:.8rem 1rem}
+header b{display:block;font-size:1.05rem}header small{opacity:.75}
+main{max-width:760px;margin:0 auto;padding:.5rem 1rem 2rem}
+.stats{display:flex;flex-wrap:wrap;gap:.4rem;margin:.6rem 0}
+.stats span{background:#fff;border:1px solid #ddd;border-radius:4px;padding:.2rem .5rem;font-size:.85rem}
+article{background:#fff;border-left:4px solid #999;margin:.6rem 0;padding:.6rem .8rem}
+article.h1{border-color:#c8102e}article.h2{border-color:#1d5fa8}article.h3{border-color:#2e7d32}
+article h2{font-size:1rem;margin:.2rem 0}article p{margin:.3rem 0;font-size:.9rem}
+.meta{color:#666;font-size:.8rem}nav{display:flex;justify-content:space-between;margin:1rem 0}
+a{color:#1d5fa8}
+"""
+
+
+def wanted(lite, headers):
+    """?lite=1/0 wins; otherwise Save-Data or a slow ECT client hint opts in."""
+    if lite is not None:
+        return lite
+    if headers.get("save-data", "").strip().lower() == "on":
+        return True
+    return headers.get("ect", "").strip().lower() in SLOW_ECT
+
+
+def clip(value):
+    text = str(value or "")
+    return escape(text if len(text) <= TEXT_MAX else text[:TEXT_MAX].rstrip() + "…")
+
+
+def card(n):
+    hyp = news.hypothesis(n)
+    title = news.get(n, "title") or "—"
+    precursor = news.get(n, "precursor")
+    link = str(news.get(n, "link"))
+    meta = " · ".join(clip(v or "—") for v in (
+        hyp,
+        news.get(n, "source"),
+        news.get(n, "date"),
+        news.get(n, "country"),
+    ))
+    parts = [f'<article class="{escape(hyp.lower())}"><div class="meta">{meta}</div><h2>{clip(title)}</h2>']
+    if precursor:
+        parts.append(f"<p>⚡ {clip(precursor)}</p>")
+    if link.startswith(("http://", "https://")):
+        parts.append(f'<p><a href="{escape(link)}" rel="noopener">Ver nota →</a></p>')
+    parts.append("</article>")
+    return "".join(parts)
+
+
+def render(session_id, s, items, stats, offset):
+    """Stats plus as many cards from `offset` as fit PAGE_SIZE and BYTE_BUDGET.
+
+    Pages are plain links carrying the next offset, so a page never costs
+    more than the budget no matter how large the report is.
+    """
+    base = f"/view/{session_id}?lite=1"
+    offset = min(offset, len(items))
+    head = (
+        '<!DOCTYPE html><html lang="es"><head><meta charset="UTF-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>Monitor de Noticias — CEPLAN</title><style>{CSS}</style></head><body>"
+        f"<header><b>Monitor de Noticias</b><small>{escape(s['start'])} — {escape(s['end'])}"
+        f"{' · ' + escape(str(s['variable'])) if s.get('variable') else ''}</small></header><main>"
+        '<div class="stats">'
+        f"<span>{stats['total']} noticias</span><span>H1: {stats['H1']}</span>"
+        f"<span>H2: {stats['H2']}</span><span>H3: {stats['H3']}</span>"
+        f"<span>{stats['sources']} fuentes</span></div>"
+    )
+    tail_max = 400  # nav + closing tags
+    used = len(head.encode("utf-8")) + tail_max
+    cards, end = [], offset
+    for n in items[offset:offset + PAGE_SIZE]:
+        html = card(n) if isinstance(n, dict) else ""
+        size = len(html.encode("utf-8"))
+        if cards and used + size > BYTE_BUDGET:
+            break
+        cards.append(html)
+        used += size
+        end += 1
+
+    nav = []
+    if offset > 0:
+        nav.append(f'<a href="{base}">« Inicio</a>')
+    nav.append(f'<span class="meta">{offset + 1 if cards else offset}–{end} de {len(items)}</span>')
+    if end < len(items):
+        nav.append(f'<a href="{base}&amp;from={end}">Siguientes »</a>')
+    if not cards:
+        cards.append("<p>No hay noticias en este rango.</p>")
+    return "".join([
+        head, *cards,
+        "<nav>", *nav, "</nav>",
+        f'<p class="meta"><a href="/view/{session_id}?lite=0">Versión completa</a></p>',
+        "</main></body></html>",
+    ])
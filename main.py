@@ -1,12 +1,43 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Any, Optional
-import uuid
+from pydantic import BaseModel, ValidationError
+from typing import Any, List, Optional
+import hmac
+from array import array
+from html import escape
 import json
+import os
+import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+import broadcast
+import cluster
+import diffs
+import enrich
+import facets
+import itempool
+import jobs
+import journal
+import lite as lite_view
+import news
+import warehouse
+import assets
+import formats
+import querycache
+import store
+import topics
+import trends
+
 app = FastAPI(title="Vigilancia Prospectiva API")
 
 app.add_middleware(
@@ -17,15 +48,131 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-sessions = {}
-SESSION_TTL_HOURS = 24
+SESSION_TTL_HOURS = store.SESSION_TTL_HOURS
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "50"))
+APPEND_MAX_ITEMS = int(os.environ.get("APPEND_MAX_ITEMS", "500"))
+BASE_URL = os.environ.get("BASE_URL", "https://dashboard-rmj8.onrender.com")
+
+batch_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("BATCH_WORKERS", "4")))
+
+# Routes whose first path parameter is a session id; used by the cluster router.
+SESSION_PATH = re.compile(r"^/(?:view|data|stream|facets|query|trends|diff|sessions)/([0-9a-f]{16})(?:/[a-z]+|/[0-9a-f]{16})?$")
+
+
+def forget_session(session_id):
+    # Release per-session structures that live outside the store.
+    broadcast.drop(session_id)
+    querycache.cache.invalidate(session_id)
+    facets.drop(session_id)
+    trends.drop(session_id)
+    topics.drop(session_id)
+    diffs.drop(session_id)
+    jobs.queue.drop(session_id)
+    index_locks.pop(session_id, None)
 
 
 def cleanup_sessions():
-    now = datetime.utcnow()
-    expired = [k for k, v in sessions.items() if v["expires"] < now]
-    for k in expired:
-        del sessions[k]
+    for session_id in store.cleanup():
+        forget_session(session_id)
+    # Compressing idle sessions is slow, so it runs on the job pool.
+    if store.compaction_due():
+        jobs.queue.run(store.compact_scheduled)
+
+
+def export_session(session_id):
+    s = store.export(session_id)
+    return {**s, "id": session_id, "expires": s["expires"].isoformat()}
+
+
+def import_session(payload):
+    s = dict(payload)
+    session_id = s.pop("id")
+    s["expires"] = datetime.fromisoformat(s["expires"])
+    store.put(session_id, s)
+    jobs.queue.submit(session_id, s["data"])
+    return session_id
+
+
+def handoff_sessions():
+    # Push sessions the ring no longer assigns to this node to their new owner.
+    for session_id in store.ids():
+        owner = cluster.owner_of(session_id)
+        if owner == cluster.NODE_ID:
+            continue
+        try:
+            cluster.post_json(f"{cluster.ring.url(owner)}/cluster/handoff", export_session(session_id))
+        except (OSError, KeyError):
+            continue
+        store.evict(session_id)
+        forget_session(session_id)
+
+
+@app.middleware("http")
+async def route_to_owner(request: Request, call_next):
+    m = SESSION_PATH.match(request.url.path)
+    if m and cluster.is_clustered() and "_hop" not in request.query_params:
+        session_id = m.group(1)
+        owner = cluster.owner_of(session_id)
+        if not store.contains(session_id) and owner != cluster.NODE_ID:
+            query = request.url.query
+            target = f"{cluster.ring.url(owner)}{request.url.path}?{query + '&' if query else ''}_hop=1"
+            return RedirectResponse(target, status_code=307)
+    return await call_next(request)
+
+
+if journal.ENABLED:
+    # Added last so it is outermost and also sees cluster redirects.
+    app.add_middleware(journal.JournalMiddleware)
+
+
+@app.on_event("shutdown")
+def flush_journal():
+    journal.journal.close()
+
+
+@app.on_event("startup")
+def announce_to_cluster():
+    if cluster.ENABLED and len(cluster.CONFIGURED) > 1:
+        threading.Thread(target=cluster.announce, args=(handoff_sessions,), daemon=True).start()
+
+
+def check_cluster_secret(request: Request):
+    if not cluster.ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    secret = request.headers.get("X-Cluster-Secret", "")
+    if not hmac.compare_digest(secret.encode(), cluster.CLUSTER_SECRET.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def check_admin_token(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth.lower().startswith("bearer ") else request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+
+
+def check_write_token(s, request: Request):
+    # Each session has its own token, handed out once by /generateOutputs.
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth.lower().startswith("bearer ") else request.headers.get("x-write-token", "")
+    expected = s.get("write_token") or ""
+    if not expected or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized", headers={"WWW-Authenticate": "Bearer"})
+
+
+class EvictRequest(BaseModel):
+    ids: List[str] = []
+    min_bytes: Optional[int] = None
+    min_age_seconds: Optional[int] = None
+    min_idle_seconds: Optional[int] = None
+
+
+class JoinRequest(BaseModel):
+    node_id: str
+    url: str
 
 
 class GenerateRequest(BaseModel):
@@ -35,15 +182,230 @@ class GenerateRequest(BaseModel):
     noticias_json: Any
 
 
+class AppendRequest(BaseModel):
+    noticias: List[dict]
+
+
+class BatchRequest(BaseModel):
+    # Items are validated one by one so a bad entry does not reject the batch.
+    items: List[Any]
+
+
 @app.get("/")
 def root():
     return {"status": "ok", "service": "Vigilancia Prospectiva API"}
 
 
-@app.post("/generateOutputs")
-def generate_outputs(req: GenerateRequest):
+@app.get("/stats")
+def store_stats():
+    return {
+        **store.stats(),
+        "jobs": {"workers": jobs.WORKERS, "pending": jobs.queue.pending},
+        "enrich": {"enabled": enrich.ENABLED, **enrich.enricher.stats},
+        "journal": journal.stats(),
+        "query_cache": querycache.cache.describe(),
+        "item_pool": itempool.pool.stats(),
+    }
+
+
+ADMIN_SORT_KEYS = ("bytes", "items", "age_seconds", "idle_seconds", "views")
+
+
+@app.get("/admin/sessions")
+def admin_sessions(request: Request, sort: str = "bytes", limit: int = 50, asc: bool = False):
+    check_admin_token(request)
+    if sort not in ADMIN_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort debe ser uno de: {', '.join(ADMIN_SORT_KEYS)}")
     cleanup_sessions()
+    rows = [r for r in map(store.describe, store.ids()) if r is not None]
+    rows.sort(key=lambda r: r[sort], reverse=not asc)
+    return {
+        "count": len(rows),
+        "total_bytes": sum(r["bytes"] for r in rows),
+        "sessions": rows[:max(limit, 0)],
+    }
+
+
+@app.delete("/admin/sessions/{session_id}")
+def admin_evict_session(session_id: str, request: Request):
+    check_admin_token(request)
+    if not store.evict(session_id):
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    forget_session(session_id)
+    return {"evicted": [session_id]}
+
+
+@app.post("/admin/sessions/evict")
+def admin_evict_sessions(req: EvictRequest, request: Request):
+    """Evict sessions listed in ids plus those matching every given predicate."""
+    check_admin_token(request)
+    predicates = []
+    if req.min_bytes is not None:
+        predicates.append(lambda r: r["bytes"] >= req.min_bytes)
+    if req.min_age_seconds is not None:
+        predicates.append(lambda r: r["age_seconds"] >= req.min_age_seconds)
+    if req.min_idle_seconds is not None:
+        predicates.append(lambda r: r["idle_seconds"] >= req.min_idle_seconds)
+    ids = set(req.ids)
+    evicted = []
+    for session_id in store.ids():
+        if session_id not in ids:
+            row = predicates and store.describe(session_id)
+            if not row or not all(p(row) for p in predicates):
+                continue
+        if store.evict(session_id):
+            forget_session(session_id)
+            evicted.append(session_id)
+    return {"evicted": evicted, "remaining": len(store.sessions)}
+
+
+@app.get("/warehouse/query")
+def warehouse_query(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    hipotesis: Optional[str] = None,
+    fuente: Optional[str] = None,
+    pais: Optional[str] = None,
+    variable: Optional[str] = None,
+    q: Optional[str] = None,
+    group_by: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+):
+    """Query the cross-session archive; dates are YYYY-MM-DD, lists comma-separated."""
+    if not warehouse.ENABLED:
+        raise HTTPException(status_code=404, detail="Almacén histórico deshabilitado (WAREHOUSE_PATH)")
+    filters = {}
+    for name, value in (("hipotesis", hipotesis), ("fuente", fuente), ("pais", pais), ("variable", variable)):
+        if value:
+            filters[name] = [v.strip() for v in value.split(",") if v.strip()]
+    if "hipotesis" in filters:
+        filters["hipotesis"] = [v.upper() for v in filters["hipotesis"]]
+    groups = [g.strip() for g in group_by.split(",") if g.strip()] if group_by else []
+    unknown = [g for g in groups if g not in warehouse.GROUPS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"group_by debe usar: {', '.join(warehouse.GROUPS)}")
+    return warehouse.query(filters, start=start, end=end, q=q, group_by=groups, limit=limit, offset=max(offset, 0))
+
+
+@app.get("/cluster")
+def cluster_state(request: Request):
+    check_cluster_secret(request)
+    return {"node_id": cluster.NODE_ID, "nodes": cluster.ring.nodes, "sessions": len(store.sessions)}
+
+
+@app.post("/cluster/join")
+def cluster_join(req: JoinRequest, request: Request):
+    check_cluster_secret(request)
+    if not cluster.is_member(req.node_id, req.url):
+        raise HTTPException(status_code=403, detail="Nodo no configurado en CLUSTER_NODES")
+    if cluster.ring.add(req.node_id, req.url.rstrip("/")):
+        threading.Thread(target=handoff_sessions, daemon=True).start()
+    return {"node_id": cluster.NODE_ID, "nodes": cluster.ring.nodes}
+
+
+@app.post("/cluster/handoff")
+def cluster_handoff(payload: dict, request: Request):
+    check_cluster_secret(request)
+    return {"session_id": import_session(payload)}
+
+
+def news_items(data):
+    items = data.get("noticias") if isinstance(data, dict) else None
+    return items if isinstance(items, list) else []
+
+
+# Post-processing stages, run by the job queue after a session is stored.
+# Appends and index builds of one session are serialised by its own lock;
+# other sessions are not held up (the indexes also lock their own updates).
+index_locks = {}
+
+
+def index_lock(session_id):
+    lock = index_locks.get(session_id)
+    if lock is None:
+        lock = index_locks.setdefault(session_id, threading.Lock())
+    return lock
+
+
+def catch_up(session_id, items):
+    # Extend the built indexes with the items appended since they were built.
+    # Callers hold the session's index_lock, so each item is added exactly once.
+    for built in (facets.indexes, diffs.signatures, trends.trends, topics.models):
+        x = built.get(session_id)
+        if x is not None and x.size < len(items):
+            x.extend(items[x.size:])
+
+
+def build_index(module, session_id, data):
+    # Built from a snapshot outside the lock; appends that land meanwhile
+    # are picked up by catch_up, here or in append_items, whichever runs last.
+    module.build(session_id, list(news_items(data)))
+    s = store.get(session_id)
+    if s is not None:
+        with index_lock(session_id):
+            catch_up(session_id, news_items(s["data"]))
+
+
+def index_session(session_id, data):
+    build_index(facets, session_id, data)
+
+
+def count_trends(session_id, data):
+    build_index(trends, session_id, data)
+
+
+def sign_session(session_id, data):
+    build_index(diffs, session_id, data)
+
+
+def enrich_session(session_id, data):
+    urls = [u for u in (news.get(n, "link") for n in news_items(data) if isinstance(n, dict)) if u]
+    if not urls:
+        return
+    # Runs on the stage's own workers (see add_stage below), not the shared pool.
+    results = enrich.enricher.submit(urls).result()
+    if not store.contains(session_id):
+        return
+    with index_lock(session_id):
+        s = store.get(session_id)
+        if s is None:
+            return
+        updates = {}
+        for i, n in enumerate(news_items(s["data"])):
+            link = isinstance(n, dict) and news.get(n, "link")
+            if link in results and n.get("_link") != results[link]:
+                updates[i] = {**n, "_link": results[link]}
+        store.replace_items(session_id, updates)
+
+
+def cluster_session(session_id, data):
+    build_index(topics, session_id, data)
+
+
+def archive_session(session_id, data):
+    s = store.sessions.get(session_id)
+    warehouse.ingest(session_id, s["variable"] if s else "", news_items(data))
+
+
+def pool_items(session_id, data):
+    store.intern(session_id)
 
+
+if itempool.ENABLED:
+    jobs.queue.add_stage("pool", pool_items)
+jobs.queue.add_stage("facets", index_session)
+jobs.queue.add_stage("signatures", sign_session)
+jobs.queue.add_stage("trends", count_trends)
+if warehouse.ENABLED:
+    jobs.queue.add_stage("warehouse", archive_session)
+if topics.ENABLED:
+    jobs.queue.add_stage("topics", cluster_session)
+if enrich.ENABLED:
+    jobs.queue.add_stage("enrich", enrich_session, workers=enrich.WORKERS)
+
+
+def create_session(req: GenerateRequest):
     if isinstance(req.noticias_json, str):
         try:
             data = json.loads(req.noticias_json)
@@ -51,342 +413,316 @@ def generate_outputs(req: GenerateRequest):
             raise HTTPException(status_code=400, detail="noticias_json is not valid JSON string")
     else:
         data = req.noticias_json
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="noticias_json must be a JSON object")
+    meta = data.get("metadata")
 
-    session_id = str(uuid.uuid4()).replace("-", "")[:16]
-    sessions[session_id] = {
+    session_id = cluster.new_session_id()
+    write_token = secrets.token_urlsafe(24)
+    store.put(session_id, {
         "data": data,
         "start": req.start,
         "end": req.end,
         "variable": req.variable or "",
         "expires": datetime.utcnow() + timedelta(hours=SESSION_TTL_HOURS),
-    }
+        "write_token": write_token,
+    })
+
+    jobs.queue.submit(session_id, data)
 
-    BASE_URL = "https://dashboard-rmj8.onrender.com"
     view_path = f"{BASE_URL}/view/{session_id}"
 
-    return JSONResponse({
+    return {
         "success": True,
         "session_id": session_id,
         "view_url": view_path,
         "message": f"Reporte listo. Abre este enlace: {view_path}",
-        "total_news": data.get("metadata", {}).get("total_news", "?"),
+        "total_news": meta.get("total_news", "?") if isinstance(meta, dict) else "?",
+        "write_token": write_token,
+    }
+
+
+@app.post("/generateOutputs")
+def generate_outputs(req: GenerateRequest):
+    cleanup_sessions()
+    return JSONResponse(create_session(req))
+
+
+def _create_batch_item(item):
+    try:
+        return create_session(GenerateRequest.model_validate(item))
+    except ValidationError as e:
+        return {"success": False, "error": e.errors(include_url=False, include_context=False, include_input=False)}
+    except HTTPException as e:
+        return {"success": False, "error": e.detail}
+    except Exception as e:
+        return {"success": False, "error": f"{type(e).__name__}: {e}"}
+
+
+@app.post("/generateOutputs:batch")
+def generate_outputs_batch(req: BatchRequest):
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Máximo {BATCH_MAX_ITEMS} reportes por lote")
+    cleanup_sessions()
+    results = list(batch_pool.map(_create_batch_item, req.items))
+    for i, r in enumerate(results):
+        r["index"] = i
+    ok = sum(r["success"] for r in results)
+    return JSONResponse({
+        "success": ok == len(results),
+        "created": ok,
+        "failed": len(results) - ok,
+        "results": results,
     })
 
 
 @app.get("/data/{session_id}")
-def get_data(session_id: str):
+def get_data(session_id: str, request: Request, format: Optional[str] = None):
     cleanup_sessions()
-    if session_id not in sessions:
+    s = store.get(session_id)
+    if s is None:
         raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
-    s = sessions[session_id]
-    return JSONResponse({**s["data"], "_meta": {"start": s["start"], "end": s["end"], "variable": s["variable"]}})
+    media = formats.negotiate(request.headers.get("accept"), format)
+    if media is None:
+        raise HTTPException(status_code=406, detail=f"Formatos disponibles: {', '.join(formats.available())}")
+    payload = {**topics.annotate(session_id, s["data"]), "_meta": {"start": s["start"], "end": s["end"], "variable": s["variable"]}}
+    headers = {"Vary": "Accept"}
+    if media == formats.MSGPACK:
+        return Response(formats.to_msgpack(payload), media_type=media, headers=headers)
+    if media == formats.COLUMNAR:
+        return JSONResponse(formats.to_columnar(payload), media_type=media, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+
+def report_stats(data):
+    items = news_items(data)
+    counts = {"H1": 0, "H2": 0, "H3": 0}
+    sources = set()
+    for n in items:
+        if not isinstance(n, dict):
+            continue
+        h = news.hypothesis(n)
+        if h in counts:
+            counts[h] += 1
+        sources.add(news.get(n, "source"))
+    sources.discard("")
+    return {"total": len(items), **counts, "sources": len(sources)}
+
+
+@app.post("/sessions/{session_id}/items")
+def append_items(session_id: str, req: AppendRequest, request: Request):
+    if len(req.noticias) > APPEND_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Máximo {APPEND_MAX_ITEMS} noticias por envío")
+    cleanup_sessions()
+    s = store.get(session_id)
+    if s is None:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    check_write_token(s, request)
+    data = s["data"]
+    added = store.add_items(session_id, s, req.noticias)
+    meta = data.get("metadata")
+    if isinstance(meta, dict) and isinstance(meta.get("total_news"), int):
+        meta["total_news"] += len(added)
+    with index_lock(session_id):
+        querycache.cache.invalidate(session_id)
+        catch_up(session_id, news_items(data))
+    if warehouse.ENABLED:
+        jobs.queue.run(warehouse.ingest, session_id, s["variable"], added)
+    stats = report_stats(data)
+    seq = broadcast.channel(session_id).publish("items", {"noticias": added, "stats": stats})
+    return {"success": True, "added": len(added), "seq": seq, "stats": stats}
+
+
+@app.get("/stream/{session_id}")
+def stream_session(session_id: str, request: Request):
+    cleanup_sessions()
+    if store.get(session_id) is None:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    ch = broadcast.channel(session_id)
+    sub = broadcast.reserve(ch)
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Demasiados espectadores conectados", headers={"Retry-After": "30"})
+    if not store.contains(session_id):
+        broadcast.drop(session_id)  # expired meanwhile; the stream just closes
+    last_id = request.headers.get("last-event-id", "")
+    cursor = int(last_id) + 1 if last_id.isdigit() else ch.next_seq
+    return broadcast.SubscriptionResponse(
+        sub,
+        cursor,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def raise_not_ready(session_id):
+    if not store.contains(session_id):
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    raise HTTPException(
+        status_code=503,
+        detail={"message": "Sesión en procesamiento", "status": jobs.queue.get(session_id)},
+        headers={"Retry-After": "1"},
+    )
 
 
-@app.get("/view/{session_id}", response_class=HTMLResponse)
-def view_report(session_id: str):
+@app.get("/sessions/{session_id}/status")
+def session_status(session_id: str):
     cleanup_sessions()
-    if session_id not in sessions:
-        return HTMLResponse("""<!DOCTYPE html>
-<html lang="es"><head><meta charset="UTF-8"><title>Sesión expirada</title>
-<style>
-  body{font-family:'Segoe UI',sans-serif;display:flex;align-items:center;justify-content:center;
-  min-height:100vh;margin:0;background:#f5f5f5;}
-  .box{text-align:center;padding:3rem;background:#fff;border-radius:12px;
-  box-shadow:0 4px 24px rgba(0,0,0,0.08);max-width:400px;}
-  h1{color:#C8102E;font-size:1.4rem;margin-bottom:1rem;}
-  p{color:#666;font-size:0.9rem;}
-</style></head>
-<body><div class="box">
-  <h1>⚠️ Sesión no disponible</h1>
-  <p>Esta sesión expiró o no existe.<br>Genera un nuevo reporte desde ChatGPT.</p>
-</div></body></html>""", status_code=404)
+    if not store.contains(session_id):
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    return {"session_id": session_id, **(jobs.queue.get(session_id) or {"state": "unknown"})}
+
+
+@app.get("/facets/{session_id}")
+def get_facets(session_id: str, hipotesis: Optional[str] = None, fuente: Optional[str] = None, pais: Optional[str] = None):
+    """Live counts per hypothesis, source and country under the active filters.
+
+    Each filter accepts several comma-separated values (OR within a facet).
+    """
+    cleanup_sessions()
+    idx = facets.indexes.get(session_id)
+    if idx is None:
+        raise_not_ready(session_id)
+    return idx.counts(facet_filters(hipotesis, fuente, pais))
+
+
+def facet_filters(hipotesis, fuente, pais):
+    filters = {}
+    for name, value in (("hipotesis", hipotesis), ("fuente", fuente), ("pais", pais)):
+        if value:
+            values = {v.strip() for v in value.split(",") if v.strip()}
+            filters[name] = {v.upper() for v in values} if name == "hipotesis" else values
+    return filters
+
+
+@app.get("/query/{session_id}")
+def query_session(
+    session_id: str,
+    hipotesis: Optional[str] = None,
+    fuente: Optional[str] = None,
+    pais: Optional[str] = None,
+    q: str = "",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=0, le=1000),
+):
+    """Items matching the facet filters and a search text, one page at a time.
+
+    Matching row ids are cached per session and normalised query, so
+    repeated filter/search combinations only pay for slicing the page.
+    """
+    cleanup_sessions()
+    s = store.get(session_id)
+    idx = facets.indexes.get(session_id)
+    if s is None or idx is None:
+        raise_not_ready(session_id)
+    filters = facet_filters(hipotesis, fuente, pais)
+    key = querycache.normalize(filters, q)
+    ids = querycache.cache.get(session_id, key)
+    items = news_items(s["data"])
+    if ids is None:
+        with index_lock(session_id):
+            size = idx.size
+            rows = facets.positions(idx.select(filters))
+        if key[1]:
+            rows = [i for i in rows if key[1] in querycache.search_text(items[i])]
+        # Appends invalidate under the index lock; only cache if none happened meanwhile.
+        with index_lock(session_id):
+            ids = querycache.cache.put(session_id, key, rows) if idx.size == size else array("I", rows)
+    page = ids[offset:offset + limit]
+    return {
+        "total": len(ids),
+        "offset": offset,
+        "ids": page.tolist(),
+        "noticias": topics.labelled(session_id, items, page),
+    }
+
+
+@app.get("/trends/{session_id}")
+def get_trends(session_id: str, limit: int = 20, hipotesis: Optional[str] = None, merge: Optional[str] = None):
+    """Approximate top terms and bigrams of titles and precursors.
+
+    Counts come from Space-Saving sketches: each count overestimates the
+    true frequency by at most its error. merge= adds other sessions
+    (comma-separated) to the totals.
+    """
+    cleanup_sessions()
+    t = trends.trends.get(session_id)
+    if t is None:
+        raise_not_ready(session_id)
+    ids, missing = [session_id], []
+    for other in (merge or "").split(","):
+        other = other.strip()
+        if not other or other in ids:
+            continue
+        if other in trends.trends:
+            ids.append(other)
+        else:
+            missing.append(other)
+    if len(ids) > 1:
+        t = trends.Trends.merge([trends.trends[i] for i in ids if i in trends.trends])
+    groups = None
+    if hipotesis:
+        groups = {v.strip().upper() for v in hipotesis.split(",") if v.strip()}
+    return {
+        "sessions": ids,
+        "missing": missing,
+        "items": t.size,
+        "k": trends.K,
+        "groups": t.snapshot(max(1, min(limit, trends.K)), groups),
+    }
 
-    s = sessions[session_id]
-    data_json = json.dumps(s["data"], ensure_ascii=False)
 
-    html = f"""<!DOCTYPE html>
+@app.get("/static/{name}")
+def static_asset(name: str, request: Request):
+    found = assets.pick(name, request.headers.get("accept-encoding"))
+    if found is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    path, encoding, media_type = found
+    headers = {"Cache-Control": assets.CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/diff/{old_session}/{new_session}")
+def diff_sessions(old_session: str, new_session: str, items: bool = False):
+    """What changed from old_session to new_session.
+
+    added and reclassified hold indices into the new report's noticias;
+    removed holds indices into the old one. With items=true the removed
+    items themselves are returned, since they are not in the new report.
+    """
+    cleanup_sessions()
+    old, new = diffs.signatures.get(old_session), diffs.signatures.get(new_session)
+    if old is None:
+        raise_not_ready(old_session)
+    if new is None:
+        raise_not_ready(new_session)
+    result = diffs.compare(old, new)
+    out = {
+        "old_session": old_session,
+        "new_session": new_session,
+        "counts": {k: len(v) for k, v in result.items()},
+        **result,
+    }
+    if items:
+        s = store.get(old_session)
+        old_items = news_items(s["data"]) if s else []
+        out["removed_items"] = [old_items[i] for i in result["removed"] if i < len(old_items)]
+    return out
+
+
+# The report page is the same for every session except dates and data, so
+# it is rendered once at import (before any worker fork) and split around
+# the per-session parts.
+VIEW_SHELL = re.split(r"__(?:START|END|REPORT_JSON)__", f"""<!DOCTYPE html>
 <html lang="es">
 <head>
   <meta charset="UTF-8"/>
   <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
   <title>Monitor de Noticias — CEPLAN</title>
-  <link rel="preconnect" href="https://fonts.googleapis.com">
-  <link href="https://fonts.googleapis.com/css2?family=Source+Sans+3:wght@300;400;600;700&family=Source+Serif+4:ital,wght@0,400;0,600;1,400&display=swap" rel="stylesheet">
-  <script src="https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js"></script>
-  <style>
-    :root {{
-      --rojo:       #C8102E;
-      --rojo-dark:  #9B0B22;
-      --rojo-light: #FDF0F2;
-      --rojo-mid:   #E8C0C8;
-      --gris:       #F7F7F7;
-      --gris2:      #EFEFEF;
-      --borde:      #E0E0E0;
-      --texto:      #1A1A1A;
-      --muted:      #6B6B6B;
-      --blanco:     #FFFFFF;
-      --h1:         #C8102E;
-      --h2:         #D4700A;
-      --h3:         #1A7A3C;
-    }}
-    *, *::before, *::after {{ box-sizing: border-box; margin: 0; padding: 0; }}
-    html {{ scroll-behavior: smooth; }}
-    body {{
-      background: var(--gris);
-      color: var(--texto);
-      font-family: 'Source Sans 3', sans-serif;
-      font-size: 15px;
-      line-height: 1.6;
-    }}
-
-    /* HEADER */
-    header {{
-      background: var(--rojo);
-      position: sticky; top: 0; z-index: 100;
-      box-shadow: 0 2px 12px rgba(200,16,46,0.35);
-    }}
-    .header-inner {{
-      max-width: 1280px; margin: 0 auto;
-      padding: 0.85rem 2rem;
-      display: flex; align-items: center; justify-content: space-between; gap: 1rem; flex-wrap: wrap;
-    }}
-    .header-left {{ display: flex; align-items: center; gap: 1rem; }}
-    .header-title {{
-      font-size: 1rem; font-weight: 700;
-      letter-spacing: 0.04em; text-transform: uppercase; color: #fff;
-      border-left: 2px solid rgba(255,255,255,0.4); padding-left: 1rem;
-    }}
-    .header-title span {{
-      display: block; font-size: 0.63rem; font-weight: 400;
-      opacity: 0.82; letter-spacing: 0.08em; margin-top: 1px;
-    }}
-    .date-badge {{
-      background: rgba(255,255,255,0.18); border: 1px solid rgba(255,255,255,0.35);
-      border-radius: 4px; padding: 0.3rem 0.8rem;
-      font-size: 0.75rem; font-weight: 600; letter-spacing: 0.05em; color: #fff;
-    }}
-
-    /* HERO */
-    .hero {{
-      background: var(--blanco);
-      border-bottom: 4px solid var(--rojo);
-      padding: 2rem 2rem 1.5rem;
-    }}
-    .hero-inner {{ max-width: 1280px; margin: 0 auto; }}
-    .hero-eyebrow {{
-      font-size: 0.68rem; font-weight: 700;
-      letter-spacing: 0.18em; text-transform: uppercase;
-      color: var(--rojo); margin-bottom: 0.4rem;
-    }}
-    .hero h1 {{
-      font-family: 'Source Serif 4', serif;
-      font-size: clamp(1.7rem, 3.5vw, 2.6rem);
-      font-weight: 600; color: var(--texto); line-height: 1.15; margin-bottom: 0.5rem;
-    }}
-    .hero h1 em {{ font-style: normal; color: var(--rojo); }}
-    .variable-tag {{
-      display: inline-block;
-      background: var(--rojo-light); border: 1px solid var(--rojo-mid);
-      color: var(--rojo-dark);
-      font-size: 0.72rem; font-weight: 700;
-      letter-spacing: 0.1em; text-transform: uppercase;
-      padding: 0.25rem 0.8rem; border-radius: 3px;
-    }}
-
-    /* STATS */
-    .stats-bar {{
-      max-width: 1280px; margin: 1.5rem auto 0;
-      padding: 0 2rem;
-      display: flex; flex-wrap: wrap; gap: 1rem;
-    }}
-    .stat {{
-      background: var(--blanco);
-      border: 1px solid var(--borde);
-      border-top: 3px solid var(--rojo);
-      border-radius: 6px;
-      padding: 1rem 1.4rem;
-      flex: 1; min-width: 110px;
-    }}
-    .stat-num {{
-      font-family: 'Source Serif 4', serif;
-      font-size: 2rem; font-weight: 600; color: var(--rojo); line-height: 1;
-    }}
-    .stat-label {{
-      font-size: 0.65rem; font-weight: 700;
-      text-transform: uppercase; letter-spacing: 0.1em;
-      color: var(--muted); margin-top: 0.2rem;
-    }}
-
-    /* TOOLBAR */
-    .toolbar {{
-      max-width: 1280px; margin: 1.5rem auto 1rem;
-      padding: 0 2rem;
-      display: flex; flex-wrap: wrap; gap: 0.7rem; align-items: center;
-    }}
-    .filter-group {{ display: flex; gap: 0.4rem; flex-wrap: wrap; align-items: center; }}
-    .filter-label {{
-      font-size: 0.67rem; font-weight: 700;
-      text-transform: uppercase; letter-spacing: 0.1em; color: var(--muted);
-    }}
-    .filter-btn {{
-      font-family: 'Source Sans 3', sans-serif;
-      font-size: 0.72rem; font-weight: 700;
-      padding: 0.32rem 0.9rem; border-radius: 4px;
-      border: 1.5px solid var(--borde);
-      background: var(--blanco); color: var(--muted);
-      cursor: pointer; text-transform: uppercase; letter-spacing: 0.08em;
-      transition: all 0.14s;
-    }}
-    .filter-btn:hover {{ border-color: var(--rojo); color: var(--rojo); }}
-    .filter-btn.active {{ background: var(--rojo); border-color: var(--rojo); color: #fff; }}
-    .filter-btn.h1.active {{ background: var(--h1); border-color: var(--h1); color: #fff; }}
-    .filter-btn.h2.active {{ background: var(--h2); border-color: var(--h2); color: #fff; }}
-    .filter-btn.h3.active {{ background: var(--h3); border-color: var(--h3); color: #fff; }}
-
-    .search-input {{
-      flex: 1; min-width: 200px; max-width: 340px;
-      background: var(--blanco); border: 1.5px solid var(--borde);
-      border-radius: 4px; padding: 0.4rem 0.9rem;
-      font-family: 'Source Sans 3', sans-serif; font-size: 0.82rem;
-      color: var(--texto); outline: none; transition: border-color 0.14s;
-    }}
-    .search-input:focus {{ border-color: var(--rojo); }}
-    .search-input::placeholder {{ color: #bbb; }}
-
-    .btn-excel {{
-      margin-left: auto;
-      display: flex; align-items: center; gap: 0.4rem;
-      background: var(--blanco); border: 1.5px solid #1D6F42; color: #1D6F42;
-      border-radius: 4px; padding: 0.4rem 1rem;
-      font-family: 'Source Sans 3', sans-serif;
-      font-size: 0.75rem; font-weight: 700;
-      text-transform: uppercase; letter-spacing: 0.08em;
-      cursor: pointer; transition: all 0.14s;
-    }}
-    .btn-excel:hover {{ background: #1D6F42; color: #fff; }}
-
-    /* GRID */
-    .grid {{
-      max-width: 1280px; margin: 0 auto;
-      padding: 0 2rem 4rem;
-      display: grid;
-      grid-template-columns: repeat(auto-fill, minmax(360px, 1fr));
-      gap: 1.2rem;
-    }}
-
-    /* CARD */
-    .card {{
-      background: var(--blanco);
-      border: 1px solid var(--borde);
-      border-radius: 8px; overflow: hidden;
-      display: flex; flex-direction: column;
-      transition: box-shadow 0.18s, transform 0.18s;
-      animation: fadeUp 0.35s ease both;
-    }}
-    @keyframes fadeUp {{
-      from {{ opacity:0; transform:translateY(14px); }}
-      to   {{ opacity:1; transform:translateY(0); }}
-    }}
-    .card:hover {{
-      transform: translateY(-3px);
-      box-shadow: 0 8px 28px rgba(200,16,46,0.13);
-    }}
-    .card-stripe {{ height: 4px; background: var(--rojo); }}
-    .card.h1 .card-stripe {{ background: var(--h1); }}
-    .card.h2 .card-stripe {{ background: var(--h2); }}
-    .card.h3 .card-stripe {{ background: var(--h3); }}
-
-    .card-body {{
-      padding: 1.2rem; flex: 1;
-      display: flex; flex-direction: column; gap: 0.75rem;
-    }}
-    .card-top {{
-      display: flex; align-items: center; justify-content: space-between; gap: 0.5rem;
-    }}
-    .hyp-badge {{
-      font-size: 0.62rem; font-weight: 700;
-      padding: 0.18rem 0.55rem; border-radius: 3px;
-      text-transform: uppercase; letter-spacing: 0.1em;
-    }}
-    .hyp-badge.h1 {{ background:#FDECEA; color:var(--h1); }}
-    .hyp-badge.h2 {{ background:#FFF3E6; color:var(--h2); }}
-    .hyp-badge.h3 {{ background:#E8F5EC; color:var(--h3); }}
-
-    .source-chip {{
-      font-size: 0.62rem; font-weight: 700;
-      color: var(--muted); text-transform: uppercase; letter-spacing: 0.08em;
-      background: var(--gris2); border: 1px solid var(--borde);
-      padding: 0.15rem 0.5rem; border-radius: 3px;
-    }}
-    .card-title {{
-      font-family: 'Source Serif 4', serif;
-      font-size: 0.97rem; font-weight: 600;
-      color: var(--texto); line-height: 1.5;
-    }}
-
-    /* PRECURSOR */
-    .precursor-block {{
-      background: var(--rojo-light);
-      border-left: 3px solid var(--rojo-mid);
-      border-radius: 0 4px 4px 0;
-      padding: 0.65rem 0.85rem;
-    }}
-    .precursor-label {{
-      font-size: 0.6rem; font-weight: 700;
-      text-transform: uppercase; letter-spacing: 0.14em;
-      color: var(--rojo); margin-bottom: 0.3rem;
-    }}
-    .precursor-text {{
-      font-size: 0.83rem; color: #5a1a25;
-      line-height: 1.5; font-style: italic;
-    }}
-
-    /* CARD FOOTER */
-    .card-footer {{
-      display: flex; align-items: center; justify-content: space-between;
-      gap: 0.5rem; flex-wrap: wrap;
-      padding: 0.7rem 1.2rem;
-      border-top: 1px solid var(--gris2);
-      background: var(--gris);
-    }}
-    .meta-row {{ display: flex; gap: 0.5rem; flex-wrap: wrap; }}
-    .meta-chip {{
-      font-size: 0.63rem; color: var(--muted);
-      background: var(--blanco); border: 1px solid var(--borde);
-      padding: 0.15rem 0.5rem; border-radius: 3px;
-    }}
-    .card-link {{
-      font-size: 0.68rem; font-weight: 700;
-      color: var(--rojo); text-decoration: none;
-      padding: 0.3rem 0.8rem;
-      border: 1.5px solid var(--rojo);
-      border-radius: 4px; white-space: nowrap;
-      text-transform: uppercase; letter-spacing: 0.06em;
-      transition: all 0.14s;
-    }}
-    .card-link:hover {{ background: var(--rojo); color: #fff; }}
-
-    /* EMPTY */
-    .empty {{
-      grid-column: 1/-1; text-align: center;
-      padding: 4rem 1rem; color: var(--muted); font-size: 0.9rem;
-    }}
-
-    /* FOOTER */
-    footer {{
-      background: var(--rojo-dark); color: rgba(255,255,255,0.75);
-      padding: 1.2rem 2rem; text-align: center;
-      font-size: 0.68rem; letter-spacing: 0.06em;
-    }}
-
-    @media (max-width: 640px) {{
-      .grid {{ grid-template-columns: 1fr; padding: 0 1rem 3rem; }}
-      .hero {{ padding: 1.5rem 1rem 1rem; }}
-      .stats-bar, .toolbar {{ padding: 0 1rem; }}
-      .header-inner {{ padding: 0.8rem 1rem; }}
-      .btn-excel {{ margin-left: 0; }}
-    }}
-  </style>
+  <link rel="preload" href="{assets.url('fonts/source-sans-3.woff2')}" as="font" type="font/woff2" crossorigin>
+  <link rel="preload" href="{assets.url('fonts/source-serif-4.woff2')}" as="font" type="font/woff2" crossorigin>
+  <link rel="stylesheet" href="{assets.url('report.css')}">
+  <script src="{assets.url('report.js')}" defer></script>
 </head>
 <body>
 
@@ -398,7 +734,7 @@ def view_report(session_id: str):
         <span>CEPLAN — Centro Nacional de Planeamiento Estratégico</span>
       </div>
     </div>
-    <div class="date-badge">{s['start']} &mdash; {s['end']}</div>
+    <div class="date-badge">__START__ &mdash; __END__</div>
   </div>
 </header>
 
@@ -436,149 +772,59 @@ def view_report(session_id: str):
 
 <footer id="footer"></footer>
 
-<script>
-const RAW = {data_json};
-const noticias = RAW.noticias || [];
-const meta = RAW.metadata || {{}};
-
-// Variable tag
-(function() {{
-  const el = document.getElementById('varTag');
-  const v = "{s['variable']}";
-  if (v) el.textContent = v; else el.style.display = 'none';
-}})();
-
-// STATS
-(function() {{
-  const counts = {{H1:0, H2:0, H3:0}};
-  noticias.forEach(n => {{
-    const h = (n.Hipotesis||n.hipotesis||'').toUpperCase();
-    if (counts[h] !== undefined) counts[h]++;
-  }});
-  const srcs = new Set(noticias.map(n => n.Fuente||n.fuente).filter(Boolean)).size;
-  const bar = document.getElementById('statsBar');
-  [[noticias.length,'Total Noticias'],[counts.H1,'Hipótesis 1'],
-   [counts.H2,'Hipótesis 2'],[counts.H3,'Hipótesis 3'],[srcs,'Fuentes']].forEach(([n,l]) => {{
-    const d = document.createElement('div');
-    d.className = 'stat';
-    d.innerHTML = `<div class="stat-num">${{n}}</div><div class="stat-label">${{l}}</div>`;
-    bar.appendChild(d);
-  }});
-}})();
-
-// CARD
-function card(n, i) {{
-  const hyp = (n.Hipotesis||n.hipotesis||'').toUpperCase();
-  const hc = hyp==='H1'?'h1':hyp==='H2'?'h2':'h3';
-  const title = n['Hecho/Titular']||n.titulo||'—';
-  const source = n.Fuente||n.fuente||'—';
-  const date = n.Fecha||n.fecha||'—';
-  const country = n.País||n.pais||'—';
-  const precursor = n['Hecho precursor']||n.precursor||'';
-  const link = n.Enlace||n.enlace||'#';
-  const delay = Math.min(i*0.04, 0.6);
-  return `
-  <div class="card ${{hc}}" style="animation-delay:${{delay}}s"
-       data-hyp="${{hyp}}" data-title="${{title.toLowerCase()}}"
-       data-source="${{source.toLowerCase()}}" data-country="${{country.toLowerCase()}}"
-       data-precursor="${{precursor.toLowerCase()}}">
-    <div class="card-stripe"></div>
-    <div class="card-body">
-      <div class="card-top">
-        <span class="hyp-badge ${{hc}}">${{hyp||'—'}}</span>
-        <span class="source-chip">${{source}}</span>
-      </div>
-      <div class="card-title">${{title}}</div>
-      ${{precursor ? `
-      <div class="precursor-block">
-        <div class="precursor-label">⚡ Hecho Precursor</div>
-        <div class="precursor-text">${{precursor}}</div>
-      </div>` : ''}}
-    </div>
-    <div class="card-footer">
-      <div class="meta-row">
-        <span class="meta-chip">📅 ${{date}}</span>
-        <span class="meta-chip">🌍 ${{country}}</span>
-      </div>
-      ${{link!=='#'?`<a class="card-link" href="${{link}}" target="_blank" rel="noopener">Ver nota →</a>`:''}}
-    </div>
-  </div>`;
-}}
-
-function render(list) {{
-  const grid = document.getElementById('grid');
-  if (!list.length) {{
-    grid.innerHTML = '<div class="empty">No se encontraron noticias con ese criterio.</div>';
-    return;
-  }}
-  grid.innerHTML = list.map((n,i) => card(n,i)).join('');
-}}
-
-// FILTER + SEARCH
-let activeFilter = 'all', searchTerm = '';
-
-function applyFilters() {{
-  let r = noticias;
-  if (activeFilter !== 'all')
-    r = r.filter(n => (n.Hipotesis||n.hipotesis||'').toUpperCase() === activeFilter);
-  if (searchTerm) {{
-    const q = searchTerm.toLowerCase();
-    r = r.filter(n => {{
-      return (n['Hecho/Titular']||n.titulo||'').toLowerCase().includes(q)
-          || (n.Fuente||n.fuente||'').toLowerCase().includes(q)
-          || (n.País||n.pais||'').toLowerCase().includes(q)
-          || (n['Hecho precursor']||n.precursor||'').toLowerCase().includes(q);
-    }});
-  }}
-  render(r);
-}}
-
-document.querySelector('.toolbar').addEventListener('click', e => {{
-  if (!e.target.matches('.filter-btn')) return;
-  document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
-  e.target.classList.add('active');
-  activeFilter = e.target.dataset.filter;
-  applyFilters();
-}});
-
-document.getElementById('searchInput').addEventListener('input', e => {{
-  searchTerm = e.target.value.trim();
-  applyFilters();
-}});
-
-// EXCEL EXPORT
-document.getElementById('btnExcel').addEventListener('click', () => {{
-  const rows = noticias.map(n => ({{
-    'Hipótesis':       n.Hipotesis||n.hipotesis||'',
-    'Hecho/Titular':   n['Hecho/Titular']||n.titulo||'',
-    'Hecho Precursor': n['Hecho precursor']||n.precursor||'',
-    'Fecha':           n.Fecha||n.fecha||'',
-    'Fuente':          n.Fuente||n.fuente||'',
-    'País':            n.País||n.pais||'',
-    'Enlace':          n.Enlace||n.enlace||'',
-  }}));
-  const ws = XLSX.utils.json_to_sheet(rows);
-  ws['!cols'] = [{{wch:8}},{{wch:62}},{{wch:55}},{{wch:13}},{{wch:14}},{{wch:20}},{{wch:60}}];
-  const wb = XLSX.utils.book_new();
-  XLSX.utils.book_append_sheet(wb, ws, 'Noticias');
-  const d = "{s['start']}_al_{s['end']}".replace(/-/g,'');
-  XLSX.writeFile(wb, `Vigilancia_Prospectiva_${{d}}.xlsx`);
-}});
-
-// FOOTER
-(function() {{
-  const gen = meta.generated_at ? new Date(meta.generated_at).toLocaleString('es-PE') : '—';
-  const errors = meta.stats?.errors ?? 0;
-  document.getElementById('footer').innerHTML =
-    `CEPLAN — Centro Nacional de Planeamiento Estratégico &nbsp;|&nbsp;
-     Generado: ${{gen}} &nbsp;|&nbsp; Modelo: ${{meta.model||'—'}} &nbsp;|&nbsp;
-     ${{meta.total_news||noticias.length}} noticias procesadas
-     ${{errors>0 ? ' &nbsp;|&nbsp; ⚠️ '+errors+' errores' : ''}} &nbsp;|&nbsp; Sesión válida 24h`;
-}})();
-
-render(noticias);
-</script>
+<script id="report" type="application/json">__REPORT_JSON__</script>
 </body>
-</html>"""
-    return HTMLResponse(html)
+</html>""")
+
+
+@app.get("/view/{session_id}", response_class=HTMLResponse)
+def view_report(
+    session_id: str,
+    request: Request,
+    lite: Optional[bool] = None,
+    offset: int = Query(0, alias="from", ge=0),
+):
+    cleanup_sessions()
+    s = store.get(session_id)
+    if s is not None:
+        s["views"] += 1
+    if s is None:
+        return HTMLResponse("""<!DOCTYPE html>
+<html lang="es"><head><meta charset="UTF-8"><title>Sesión expirada</title>
+<style>
+  body{font-family:'Segoe UI',sans-serif;display:flex;align-items:center;justify-content:center;
+  min-height:100vh;margin:0;background:#f5f5f5;}
+  .box{text-align:center;padding:3rem;background:#fff;border-radius:12px;
+  box-shadow:0 4px 24px rgba(0,0,0,0.08);max-width:400px;}
+  h1{color:#C8102E;font-size:1.4rem;margin-bottom:1rem;}
+  p{color:#666;font-size:0.9rem;}
+</style></head>
+<body><div class="box">
+  <h1>⚠️ Sesión no disponible</h1>
+  <p>Esta sesión expiró o no existe.<br>Genera un nuevo reporte desde ChatGPT.</p>
+</div></body></html>""", status_code=404)
+
+    # Lite responses depend on these hints; the full view asks for ECT.
+    headers = {"Vary": "Save-Data, ECT", "Accept-CH": "ECT, Save-Data"}
+    if lite_view.wanted(lite, request.headers):
+        data = s["data"]
+        return HTMLResponse(
+            lite_view.render(session_id, s, news_items(data), report_stats(data), offset),
+            headers=headers,
+        )
+
+    report = {
+        "session_id": session_id,
+        "start": s["start"],
+        "end": s["end"],
+        "variable": s["variable"],
+        "data": formats.to_columnar(topics.annotate(session_id, s["data"])),
+    }
+    # "</" is escaped so item text can never close the script element.
+    report_json = json.dumps(report, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+    start, end = escape(s["start"]), escape(s["end"])
+    return HTMLResponse("".join([
+        VIEW_SHELL[0], start, VIEW_SHELL[1], end, VIEW_SHELL[2], report_json, VIEW_SHELL[3],
+    ]), headers=headers)
 
@@ -0,0 +1,35 @@
+import hashlib
+
+# Reading a news item. Reports use the "Hecho/Titular" style keys, older
+# ones the lowercase short names; the view falls back the same way.
+KEYS = {
+    "title": ("Hecho/Titular", "titulo"),
+    "precursor": ("Hecho precursor", "precursor"),
+    "source": ("Fuente", "fuente"),
+    "country": ("País", "pais"),
+    "date": ("Fecha", "fecha"),
+    "link": ("Enlace", "enlace"),
+    "hypothesis": ("Hipotesis", "hipotesis"),
+}
+
+
+def get(n, field):
+    """The item's value for field (a KEYS name), or "" if it has none."""
+    key, fallback = KEYS[field]
+    return n.get(key) or n.get(fallback) or ""
+
+
+def hypothesis(n):
+    return str(get(n, "hypothesis")).upper()
+
+
+def identity(n):
+    """Stable hash of an item: its normalised link, or title/date/source without one.
+
+    Stored as the warehouse primary key, so it must not change.
+    """
+    link = str(get(n, "link")).strip().rstrip("/")
+    key = link.lower() if link else "|".join(
+        str(n.get(k) or "") for k in ("Hecho/Titular", "Fecha", "Fuente")
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
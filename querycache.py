@@ -0,0 +1,104 @@
+import os
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+import news
+
+MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_ENTRIES", "1024"))
+MAX_IDS = int(os.environ.get("QUERY_CACHE_MAX_IDS", str(4 << 20)))  # ~16 MB of uint32
+
+
+def fold(text):
+    """Lowercase, accent-free, single-spaced; the view's search worker folds the same way."""
+    text = unicodedata.normalize("NFD", str(text or "").lower())
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).split())
+
+
+def search_text(n):
+    """Title, source, country and precursor folded into one searchable string."""
+    if not isinstance(n, dict):
+        return ""
+    return fold(" ".join(str(news.get(n, f)) for f in ("title", "source", "country", "precursor")))
+
+
+def normalize(filters, q):
+    """Hashable key for a query: sorted facet values plus the folded search text."""
+    return tuple(sorted((f, tuple(sorted(v))) for f, v in filters.items() if v)), fold(q)
+
+
+class QueryCache:
+    """LRU of query results as uint32 row-id arrays, keyed by (session, query).
+
+    Bounded by entry count and by the total number of cached ids. Entries
+    of a session are dropped together when it is modified or expires.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_ids=MAX_IDS):
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self._entries = OrderedDict()
+        self._by_session = {}
+        self._ids = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, session_id, key):
+        with self._lock:
+            ids = self._entries.get((session_id, key))
+            if ids is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end((session_id, key))
+            self.stats["hits"] += 1
+            return ids
+
+    def put(self, session_id, key, ids):
+        ids = array("I", ids)
+        if len(ids) > self.max_ids:
+            return ids
+        with self._lock:
+            old = self._entries.pop((session_id, key), None)
+            if old is not None:
+                self._ids -= len(old)
+            self._entries[(session_id, key)] = ids
+            self._by_session.setdefault(session_id, set()).add(key)
+            self._ids += len(ids)
+            while len(self._entries) > self.max_entries or self._ids > self.max_ids:
+                (sid, k), dropped = self._entries.popitem(last=False)
+                self._forget(sid, k, dropped)
+                self.stats["evictions"] += 1
+        return ids
+
+    def _forget(self, session_id, key, ids):
+        self._ids -= len(ids)
+        keys = self._by_session.get(session_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_session[session_id]
+
+    def invalidate(self, session_id):
+        with self._lock:
+            for key in self._by_session.pop(session_id, ()):
+                ids = self._entries.pop((session_id, key), None)
+                if ids is not None:
+                    self._ids -= len(ids)
+                    self.stats["invalidations"] += 1
+
+    def describe(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "ids": self._ids,
+                "bytes": self._ids * 4,
+                "max_entries": self.max_entries,
+                "max_ids": self.max_ids,
+            }
+
+
+cache = QueryCache()
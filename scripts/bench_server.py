@@ -0,0 +1,139 @@
+"""Compare serve.py configurations under the same local load.
+
+    python scripts/bench_server.py --duration 10 --concurrency 32
+
+Each configuration is started on its own port, warmed up, and hit with
+keep-alive connections from a thread pool. Paths are stateless (health
+check, a static asset and report creation) so multi-worker runs are
+comparable with single-worker ones.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = [
+    ("1 worker, asyncio + h11", ["--workers", "1", "--loop", "asyncio", "--http", "h11"]),
+    ("1 worker, uvloop + httptools", ["--workers", "1", "--loop", "uvloop", "--http", "httptools"]),
+    ("{n} workers, uvloop + httptools", ["--workers", "{n}", "--stateless", "--loop", "uvloop", "--http", "httptools"]),
+]
+
+PAYLOAD = json.dumps({
+    "start": "2025-01-01",
+    "end": "2025-01-31",
+    "noticias_json": {
+        "metadata": {"total_news": 20},
+        "noticias": [
+            {"Hecho/Titular": f"Titular {i}", "Fuente": "Reuters", "País": "Perú", "Hipotesis": "H1"}
+            for i in range(20)
+        ],
+    },
+}).encode()
+
+
+def wait_ready(port, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def static_path(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", "/generateOutputs", PAYLOAD, {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    view = json.loads(resp.read())["view_url"]
+    conn.request("GET", "/view/" + view.rsplit("/", 1)[1])
+    html = conn.getresponse().read().decode()
+    return re.search(r'src="(/static/[^"]+\.js)"', html).group(1)
+
+
+def load(port, requests, duration, concurrency):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        local, i = [], offset
+        while time.perf_counter() < stop:
+            method, path, body = requests[i % len(requests)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                headers = {"Content-Type": "application/json"} if body else {}
+                conn.request(method, path, body, headers)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 400:
+                    raise OSError(resp.status)
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                continue
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", type=float, default=10)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--port", type=int, default=8300)
+    args = ap.parse_args()
+
+    print(f"{'configuration':36} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for k, (label, flags) in enumerate(CONFIGS):
+        port = args.port + k
+        flags = [f.format(n=args.workers) for f in flags]
+        proc = subprocess.Popen(
+            [sys.executable, "serve.py", "--port", str(port), "--log-level", "warning", *flags],
+            cwd=ROOT,
+        )
+        try:
+            if not wait_ready(port):
+                print(f"{label.format(n=args.workers):36} failed to start")
+                continue
+            requests = [
+                ("GET", "/", None),
+                ("GET", static_path(port), None),
+                ("POST", "/generateOutputs", PAYLOAD),
+            ]
+            load(port, requests, 1, args.concurrency)  # warm-up
+            lat, errors = load(port, requests, args.duration, args.concurrency)
+            lat.sort()
+            ms = [x * 1000 for x in lat]
+            p99 = ms[max(0, int(len(ms) * 0.99) - 1)] if ms else 0
+            print(f"{label.format(n=args.workers):36} {len(lat) / args.duration:9.0f} "
+                  f"{statistics.median(ms) if ms else 0:8.2f} {p99:8.2f} {errors:7d}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
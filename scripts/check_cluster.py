@@ -0,0 +1,174 @@
+"""Start several local nodes in cluster mode and check routing end to end.
+
+    python scripts/check_cluster.py --nodes 3 --reports 20
+
+Each node is its own uvicorn process on its own port, sharing one
+CLUSTER_NODES list and CLUSTER_SECRET. All nodes but the last start first
+and reports are created on them; each report must be held by one node and
+readable from every node (the others answer 307 to the holder). Then the
+last node starts late: once it has joined, the sessions the ring now
+assigns to it must have been handed off to it, and nothing else may move.
+/cluster/* must refuse callers without the secret or not listed in
+CLUSTER_NODES. Exits non-zero if any check fails.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "check-cluster"
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+opener = urllib.request.build_opener(NoRedirect)
+
+
+def request(url, payload=None, headers=None, follow=True):
+    """Return (status, headers, parsed JSON body or None)."""
+    body = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=body, method="POST" if body else "GET")
+    req.add_header("Content-Type", "application/json")
+    for k, v in (headers or {}).items():
+        req.add_header(k, v)
+    try:
+        with (urllib.request.urlopen if follow else opener.open)(req, timeout=10) as resp:
+            return resp.status, resp.headers, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, None
+
+
+def wait_ready(url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if request(url + "/")[0] == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def report(i):
+    return {
+        "start": "2025-01-01",
+        "end": "2025-01-31",
+        "noticias_json": {
+            "metadata": {"total_news": 1},
+            "noticias": [{"Hecho/Titular": f"Titular {i}", "Fuente": "Reuters", "Hipotesis": "H1"}],
+        },
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nodes", type=int, default=3)
+    ap.add_argument("--reports", type=int, default=20)
+    ap.add_argument("--port", type=int, default=8400)
+    args = ap.parse_args()
+
+    nodes = {f"n{k}": f"http://127.0.0.1:{args.port + k}" for k in range(args.nodes)}
+    spec = ",".join(f"{node_id}={url}" for node_id, url in nodes.items())
+    procs = []
+    failures = []
+
+    def check(ok, what):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    secret = {"X-Cluster-Secret": SECRET}
+    late = list(nodes)[-1]
+
+    def start(k, node_id):
+        env = {**os.environ, "CLUSTER_NODES": spec, "NODE_ID": node_id, "CLUSTER_SECRET": SECRET}
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port + k), "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+        ))
+        return wait_ready(nodes[node_id])
+
+    def wait_ring(expected, timeout=20):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(request(nodes[n] + "/cluster", headers=secret)[2]["nodes"] == expected for n in expected):
+                return True
+            time.sleep(0.2)
+        return False
+
+    def check_routing(live, created, label):
+        # Exactly one live node holds each session; every other one redirects there.
+        holders = {}
+        for session_id in created:
+            owners = [n for n, url in live.items() if request(f"{url}/data/{session_id}", follow=False)[0] == 200]
+            check(len(owners) == 1, f"{label}: {session_id} held by exactly one node ({', '.join(owners)})")
+            if len(owners) != 1:
+                continue
+            owner = holders[session_id] = owners[0]
+            for node_id, url in live.items():
+                if node_id == owner:
+                    continue
+                status, headers, _ = request(f"{url}/data/{session_id}", follow=False)
+                check(status == 307 and headers.get("location", "").startswith(nodes[owner]),
+                      f"{label}: {session_id} on {node_id} redirects to {owner}")
+                status, _, body = request(f"{url}/data/{session_id}")
+                check(status == 200 and body["noticias"], f"{label}: {session_id} readable through {node_id}")
+        return holders
+
+    try:
+        early = {n: u for n, u in nodes.items() if n != late}
+        for k, node_id in enumerate(nodes):
+            if node_id != late and not start(k, node_id):
+                check(False, f"{node_id} started")
+                return 1
+        check(wait_ring(early), f"early nodes see each other: {', '.join(early)}")
+
+        created = []
+        for i in range(args.reports):
+            node_id, url = list(early.items())[i % len(early)]
+            status, _, body = request(url + "/generateOutputs", report(i))
+            check(status == 200, f"create report {i} on {node_id}")
+            if status == 200:
+                created.append(body["session_id"])
+        before = check_routing(early, created, "before join")
+
+        if not start(len(nodes) - 1, late):
+            check(False, f"{late} started")
+            return 1
+        check(wait_ring(nodes), f"{late} joined every node's ring")
+        time.sleep(1)  # handoffs run in the background after the join
+        after = check_routing(nodes, created, "after join")
+        moved = [sid for sid, owner in after.items() if owner == late]
+        check(bool(moved) and all(before.get(sid) != late for sid in moved),
+              f"{len(moved)} of {len(created)} sessions handed off to {late}")
+        check(all(after.get(sid) in (before.get(sid), late) for sid in created),
+              "sessions only moved to the joining node")
+
+        first = next(iter(nodes.values()))
+        status = request(first + "/cluster/join", {"node_id": "x", "url": "http://127.0.0.1:9"})[0]
+        check(status == 403, "/cluster/join without the secret is refused")
+        status = request(first + "/cluster/join", {"node_id": "x", "url": "http://127.0.0.1:9"}, secret)[0]
+        check(status == 403, "/cluster/join from a node outside CLUSTER_NODES is refused")
+        status, _, body = request(first + "/cluster", headers=secret)
+        check(status == 200 and body["nodes"] == nodes, "/cluster lists exactly the configured nodes")
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait()
+
+    print(f"{len(failures)} failed checks")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
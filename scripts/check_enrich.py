@@ -0,0 +1,183 @@
+"""Run the link enrichment stage against a local stub site and check it.
+
+    python scripts/check_enrich.py            # stub HTTP server on a port
+    python scripts/check_enrich.py --mock     # same pages via httpx.MockTransport
+
+The stub serves an article with og: tags, one with only <title> and a
+canonical link, a redirect, a 404 and a PDF. A report linking to them is
+created through the API with ENRICH_LINKS=1; once its "enrich" stage is
+done every item must carry the expected `_link`. A second report with the
+same links must be answered from the shared cache. Exits non-zero if any
+check fails.
+
+Both modes then check, with private addresses blocked as they are by
+default, that links and redirects to loopback, private or link-local hosts,
+non-http schemes and malformed URLs are refused without failing the rest.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ENRICH_LINKS"] = "1"
+os.environ.setdefault("ENRICH_CACHE_TTL_SECONDS", "600")
+
+PAGES = {
+    "/og": (200, "text/html; charset=utf-8", """<html><head><title>Ignored</title>
+<meta property="og:title" content="Acuerdo comercial firmado">
+<meta property="og:site_name" content="Diario Stub">
+<meta property="og:url" content="/og-canonical">
+</head><body>...</body></html>"""),
+    "/plain": (200, "text/html", """<html><head><title>  Solo
+  título </title><link rel="canonical" href="/plain-canonical"></head></html>"""),
+    "/moved": (301, "text/html", "/og"),
+    "/missing": (404, "text/html", "<html><head><title>No</title></head></html>"),
+    "/file.pdf": (200, "application/pdf", "%PDF-1.4"),
+    "/to-private": (302, "text/html", "http://127.0.0.1/og"),
+}
+
+# path -> (ok, status, title, canonical path)
+EXPECTED = {
+    "/og": (True, 200, "Acuerdo comercial firmado", "/og-canonical"),
+    "/plain": (True, 200, "Solo título", "/plain-canonical"),
+    "/moved": (True, 200, "Acuerdo comercial firmado", "/og-canonical"),
+    "/missing": (False, 404, None, "/missing"),
+    "/file.pdf": (True, 200, None, "/file.pdf"),
+}
+
+
+class Stub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, ctype, body = PAGES.get(self.path, (404, "text/plain", ""))
+        self.send_response(status)
+        if status in (301, 302):
+            self.send_header("Location", body)
+            body = ""
+        self.send_header("Content-Type", ctype)
+        raw = body.encode("utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def mock_transport():
+    import httpx
+
+    def handler(request):
+        status, ctype, body = PAGES.get(request.url.path, (404, "text/plain", ""))
+        if status in (301, 302):
+            return httpx.Response(status, headers={"Location": body})
+        return httpx.Response(status, headers={"Content-Type": ctype}, content=body.encode("utf-8"))
+
+    return httpx.MockTransport(handler)
+
+
+def blocking_enricher(enrich):
+    # Private addresses refused as by default; public.test stands in for a
+    # public site so redirects from it can be checked too.
+    class FakeDNS(enrich.Enricher):
+        async def _addresses(self, host, port):
+            if host == "public.test":
+                return {"93.184.216.34"}
+            return await super()._addresses(host, port)
+
+    return FakeDNS(transport=mock_transport(), allow_private=False)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mock", action="store_true", help="use httpx.MockTransport instead of a local server")
+    ap.add_argument("--port", type=int, default=8450)
+    args = ap.parse_args()
+
+    import enrich
+    import main as app_main
+    from fastapi.testclient import TestClient
+
+    if args.mock:
+        base = "http://stub.test"
+        enrich.enricher = enrich.Enricher(transport=mock_transport(), allow_private=True)
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), Stub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{args.port}"
+        enrich.enricher = enrich.Enricher(allow_private=True)
+
+    failures = []
+
+    def check(ok, what):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    client = TestClient(app_main.app)
+    payload = {
+        "start": "2025-01-01",
+        "end": "2025-01-31",
+        "noticias_json": {
+            "noticias": [{"Hecho/Titular": f"Noticia {p}", "Enlace": base + p} for p in EXPECTED]
+            + [{"Hecho/Titular": "Sin enlace"}],
+        },
+    }
+
+    def enriched_report():
+        session_id = client.post("/generateOutputs", json=payload).json()["session_id"]
+        deadline = time.time() + 30
+        status = {}
+        while time.time() < deadline:
+            status = client.get(f"/sessions/{session_id}/status").json()
+            if status.get("state") in ("ready", "failed"):
+                break
+            time.sleep(0.05)
+        check(status.get("stages", {}).get("enrich") == "done", f"enrich stage done ({status.get('state')})")
+        return client.get(f"/data/{session_id}").json()["noticias"]
+
+    items = enriched_report()
+    for n in items:
+        link = n.get("Enlace")
+        if link is None:
+            check("_link" not in n, "item without Enlace is left alone")
+            continue
+        path = link[len(base):]
+        ok, status, title, canonical = EXPECTED[path]
+        got = n.get("_link") or {}
+        check(
+            (got.get("ok"), got.get("status"), got.get("title"), got.get("canonical")) == (ok, status, title, base + canonical),
+            f"{path}: ok={got.get('ok')} status={got.get('status')} title={got.get('title')!r} canonical={got.get('canonical')}",
+        )
+
+    fetched = enrich.enricher.stats["fetched"]
+    enriched_report()
+    check(enrich.enricher.stats["fetched"] == fetched, "second report answered from the cache")
+    check(enrich.enricher.stats["cache_hits"] >= len(EXPECTED), f"cache hits: {enrich.enricher.stats['cache_hits']}")
+
+    blocked = {
+        "http://127.0.0.1/og": "BlockedURL",
+        "http://localhost/og": "BlockedURL",
+        "http://10.0.0.1/og": "BlockedURL",
+        "http://169.254.169.254/latest/meta-data/": "BlockedURL",
+        "http://[::1]/og": "BlockedURL",
+        "http://public.test/to-private": "BlockedURL",
+        "ftp://public.test/og": "BlockedURL",
+        "file:///etc/passwd": "BlockedURL",
+        "http://[": "ValueError",
+    }
+    results = blocking_enricher(enrich).submit(["http://public.test/og", *blocked]).result(timeout=30)
+    got = results["http://public.test/og"]
+    check(got["ok"] and got["title"] == "Acuerdo comercial firmado", "public host is fetched")
+    for url, error in blocked.items():
+        got = results[url]
+        check(not got["ok"] and got.get("error") == error, f"{url} refused ({got.get('error')})")
+
+    print(f"{len(failures)} failed checks")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
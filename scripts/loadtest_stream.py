@@ -0,0 +1,114 @@
+"""Load test for /stream/{session_id} with many simulated viewers.
+
+Start a local instance first, e.g.
+
+    uvicorn main:app --port 8000
+    python scripts/loadtest_stream.py --clients 150 --events 20
+
+Every client is a raw asyncio connection, so a few hundred run comfortably in
+one process. The script reports connect failures, events delivered and
+publish-to-receive latency.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+
+
+def post(base, path, payload, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(
+        base + path,
+        data=json.dumps(payload).encode(),
+        headers=headers,
+        method="POST",
+    )
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+async def viewer(host, port, session_id, expected, sent_at, latencies, ready):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET /stream/{session_id} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = (await reader.readline()).decode()
+    if " 200 " not in status:
+        writer.close()
+        ready.set_result(False)
+        return 0
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+    ready.set_result(True)
+    received = 0
+    event_id = None
+    try:
+        while received < expected:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line.startswith(b"id: "):
+                event_id = int(line[4:])
+            elif line.startswith(b"event: items") and event_id is not None:
+                latencies.append(time.perf_counter() - sent_at[event_id])
+                received += 1
+    finally:
+        writer.close()
+    return received
+
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--clients", type=int, default=100)
+    ap.add_argument("--events", type=int, default=20)
+    ap.add_argument("--items-per-event", type=int, default=5)
+    ap.add_argument("--interval", type=float, default=0.05)
+    args = ap.parse_args()
+
+    base = f"http://{args.host}:{args.port}"
+    created = post(base, "/generateOutputs", {
+        "start": "2025-01-01", "end": "2025-01-31",
+        "noticias_json": {"metadata": {"total_news": 0}, "noticias": []},
+    })
+    session_id, token = created["session_id"], created["write_token"]
+
+    sent_at, latencies = {}, []
+    readies = [asyncio.get_running_loop().create_future() for _ in range(args.clients)]
+    tasks = [
+        asyncio.create_task(viewer(args.host, args.port, session_id, args.events, sent_at, latencies, r))
+        for r in readies
+    ]
+    connected = sum(await asyncio.gather(*readies))
+    print(f"connected {connected}/{args.clients} viewers")
+
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    for i in range(args.events):
+        batch = [{"Hecho/Titular": f"Noticia {i}-{j}", "Fuente": "Load", "Hipotesis": f"H{j % 3 + 1}"}
+                 for j in range(args.items_per_event)]
+        # A fresh session's channel numbers events from 0, so event i is seq i.
+        sent_at[i] = time.perf_counter()
+        await loop.run_in_executor(None, post, base, f"/sessions/{session_id}/items", {"noticias": batch}, token)
+        await asyncio.sleep(args.interval)
+
+    received = await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+    elapsed = time.perf_counter() - t0
+    total = sum(received)
+    print(f"delivered {total}/{connected * args.events} events in {elapsed:.2f}s")
+    if latencies:
+        latencies.sort()
+        ms = [x * 1000 for x in latencies]
+        print(f"latency ms: p50={statistics.median(ms):.1f} "
+              f"p95={ms[int(len(ms) * 0.95) - 1]:.1f} max={ms[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""Replay a request journal against a running instance.
+
+    python scripts/replay.py journal/requests.jsonl* --target http://127.0.0.1:8000 --speed 2
+
+Requests are sent with the journal's original spacing divided by --speed
+(0 sends them back to back). Session ids created during the replay are
+mapped onto the ids recorded in the journal, so later /view, /data, /facets
+... requests hit the replayed sessions. /stream requests are skipped unless
+--streams is given, since they stay open.
+
+Prints latency per route next to the latency recorded in the journal.
+"""
+import argparse
+import base64
+import gzip
+import http.client
+import json
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+SESSION_ID = re.compile(r"[0-9a-f]{16}")
+CREATED = re.compile(rb'"session_id":\s*"([0-9a-f]{16})"')
+
+
+def read_journal(paths):
+    rows = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    rows.append(json.loads(line))
+    rows.sort(key=lambda r: r["t"])
+    return rows
+
+
+def request_body(row):
+    if row.get("body_truncated") or row.get("body_redacted"):
+        return None, False
+    if "json" in row:
+        return json.dumps(row["json"]).encode("utf-8"), True
+    if "body" in row:
+        return row["body"].encode("utf-8"), True
+    if "body_b64" in row:
+        return base64.b64decode(row["body_b64"]), True
+    return b"", True
+
+
+def route(path):
+    return SESSION_ID.sub("{id}", path)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[max(0, int(len(values) * p) - 1)] if values else 0
+
+
+class Replayer:
+    def __init__(self, target, concurrency):
+        url = urlsplit(target)
+        self.host, self.port = url.hostname, url.port or (443 if url.scheme == "https" else 80)
+        self.https = url.scheme == "https"
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.local = threading.local()
+        self.ids = {}  # recorded session id -> Future of the replayed id
+        self.lock = threading.Lock()
+        self.results = []
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self.local.conn = cls(self.host, self.port, timeout=60)
+        return conn
+
+    def rewrite(self, text):
+        def sub(m):
+            fut = self.ids.get(m.group(0))
+            if fut is None:
+                return m.group(0)
+            try:
+                return fut.result(timeout=60) or m.group(0)
+            except Exception:
+                return m.group(0)
+        return SESSION_ID.sub(sub, text)
+
+    def submit(self, row):
+        created = [Future() for _ in row.get("session_ids", [])]
+        with self.lock:
+            for old, fut in zip(row.get("session_ids", []), created):
+                self.ids[old] = fut
+        self.pool.submit(self.send, row, created)
+
+    def send(self, row, created):
+        body, ok = request_body(row)
+        path = self.rewrite(row["path"])
+        query = self.rewrite(row.get("query") or "")
+        target = path + ("?" + query if query else "")
+        status, elapsed, new_ids = None, None, []
+        if ok:
+            t0 = time.perf_counter()
+            try:
+                conn = self.connection()
+                conn.request(row["method"], target, body or None, row.get("headers") or {})
+                resp = conn.getresponse()
+                data = resp.read()
+                status = resp.status
+                elapsed = (time.perf_counter() - t0) * 1000
+                new_ids = [m.decode() for m in CREATED.findall(data[:4096])]
+            except (OSError, http.client.HTTPException):
+                self.local.conn = None
+        for fut, new in zip(created, new_ids + [None] * len(created)):
+            fut.set_result(new)
+        with self.lock:
+            self.results.append((route(row["path"]), row.get("ms"), row.get("status"), status, elapsed, ok))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def report(results, wall):
+    by_route = {}
+    for r in results:
+        by_route.setdefault(r[0], []).append(r)
+    sent = [r for r in results if r[5]]
+    print(f"{len(sent)} sent, {len(results) - len(sent)} skipped (truncated/redacted body), "
+          f"{wall:.1f}s, {len(sent) / wall if wall else 0:.1f} req/s")
+    print(f"{'route':40} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rec p50':>8} {'errors':>7} {'status!=':>8}")
+    for name, rows in sorted(by_route.items(), key=lambda kv: -len(kv[1])):
+        lat = [r[4] for r in rows if r[4] is not None]
+        recorded = [r[1] for r in rows if r[1] is not None]
+        errors = sum(1 for r in rows if r[5] and (r[3] is None or r[3] >= 500))
+        mismatched = sum(1 for r in rows if r[5] and r[3] is not None and r[3] != r[2])
+        print(f"{name[:40]:40} {len(rows):6d} {statistics.median(lat) if lat else 0:8.2f} "
+              f"{percentile(lat, 0.95):8.2f} {percentile(lat, 0.99):8.2f} "
+              f"{statistics.median(recorded) if recorded else 0:8.2f} {errors:7d} {mismatched:8d}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("journal", nargs="+", help="journal files (.jsonl or rotated .gz)")
+    ap.add_argument("--target", default="http://127.0.0.1:8000")
+    ap.add_argument("--speed", type=float, default=1.0, help="time multiplier; 0 = no waiting")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--streams", action="store_true", help="also replay /stream requests")
+    args = ap.parse_args()
+
+    rows = read_journal(args.journal)
+    if not args.streams:
+        rows = [r for r in rows if not r["path"].startswith("/stream/")]
+    if not rows:
+        print("journal is empty")
+        return
+
+    replayer = Replayer(args.target, args.concurrency)
+    start, t_first = time.perf_counter(), rows[0]["t"]
+    for row in rows:
+        if args.speed > 0:
+            delay = (row["t"] - t_first) / args.speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        replayer.submit(row)
+    replayer.close()
+    report(replayer.results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Hammer store.py from many threads and report throughput and errors.
+
+    python scripts/stress_store.py --duration 3 --threads 1,2,4,8
+    python scripts/stress_store.py --plain      # unlocked dict, for comparison
+
+Each thread mixes reads (get/contains), inserts of fresh sessions (some
+already expired), cleanup() passes and full listings, as the handler
+threadpool does. After each run every non-expired insert must still be
+present; anything missing is reported as a lost insert.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store  # noqa: E402
+
+
+class PlainSessions(dict):
+    """The previous unsharded dict, with the same helper methods and no locks."""
+
+    def pop_expired(self, now):
+        expired = [(k, v) for k, v in dict.items(self) if v["expires"] < now]
+        for k, _ in expired:
+            self.pop(k, None)
+        return expired
+
+    def keys(self):
+        return list(super().keys())
+
+    def items(self):
+        return list(super().items())
+
+    def values(self):
+        return dict.values(self)
+
+    def lock_for(self, key):
+        return threading.Lock()
+
+
+def record(expired=False):
+    delta = timedelta(hours=-1) if expired else timedelta(hours=1)
+    return {"data": {"noticias": [{"Hecho/Titular": "x"}]}, "start": "", "end": "", "variable": "",
+            "expires": datetime.utcnow() + delta}
+
+
+def run(threads, duration, seed_ids):
+    ops = [0] * threads
+    errors, kept = [], [[] for _ in range(threads)]
+    stop = time.perf_counter() + duration
+
+    def worker(t):
+        rng = random.Random(t)
+        n = 0
+        while time.perf_counter() < stop:
+            r = rng.random()
+            try:
+                if r < 0.80:
+                    sid = rng.choice(seed_ids)
+                    store.get(sid)
+                    store.contains(sid)
+                elif r < 0.97:
+                    sid = f"{t:04x}{n:012x}"
+                    expired = rng.random() < 0.2
+                    store.put(sid, record(expired))
+                    if not expired:
+                        kept[t].append(sid)
+                elif r < 0.995:
+                    store.cleanup()
+                else:
+                    store.stats()
+                    for sid in rng.sample(store.ids(), 10):
+                        store.describe(sid)
+            except Exception as e:  # counted, not raised: that is the point
+                errors.append(f"{type(e).__name__}: {e}")
+            n += 1
+        ops[t] = n
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    wall = time.perf_counter() - t0
+    lost = sum(1 for ids in kept for sid in ids if not store.contains(sid))
+    return sum(ops) / wall, len(errors), lost, errors[:3]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--duration", type=float, default=3)
+    ap.add_argument("--threads", default="1,2,4,8")
+    ap.add_argument("--sessions", type=int, default=1000)
+    ap.add_argument("--plain", action="store_true", help="use an unlocked dict instead of the sharded store")
+    args = ap.parse_args()
+
+    print(f"{'threads':>7} {'ops/s':>10} {'errors':>7} {'lost':>6}  store={'plain dict' if args.plain else f'{store.SHARDS} shards'}")
+    for threads in [int(x) for x in args.threads.split(",")]:
+        store.sessions = PlainSessions() if args.plain else store.ShardedSessions()
+        seed_ids = [f"seed{i:012x}" for i in range(args.sessions)]
+        for sid in seed_ids:
+            store.put(sid, record())
+        rate, errors, lost, sample = run(threads, args.duration, seed_ids)
+        print(f"{threads:7d} {rate:10.0f} {errors:7d} {lost:6d}  {'; '.join(sample)}")
+
+
+if __name__ == "__main__":
+    main()
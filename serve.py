@@ -0,0 +1,106 @@
+"""Production entry point.
+
+    python serve.py                      # 1 worker, uvloop + httptools
+    python serve.py --workers 4          # gunicorn master, preloaded app
+
+Most flags can also be set through the environment (PORT, SERVER_LOOP,
+SERVER_HTTP, SERVER_KEEPALIVE, SERVER_BACKLOG). The worker count is only
+taken from --workers: hosting platforms set WEB_CONCURRENCY on their own.
+
+The app is imported (static assets hashed, view shell rendered, thread
+pools created) in the parent before any fork, and the GC is frozen so the
+workers share those pages copy-on-write.
+
+Sessions live in process memory and gunicorn workers share one port, so
+with more than one worker a /view link only works when the request lands
+on the worker that created it. --workers > 1 is therefore refused unless
+--stateless acknowledges that (benchmarks, stateless routes). To scale
+out with sessions, run one serve.py per NODE_ID and port in cluster mode
+(see README).
+"""
+import argparse
+import gc
+import os
+import sys
+
+
+def parse_args(argv=None):
+    env = os.environ.get
+    ap = argparse.ArgumentParser(description="Run the Vigilancia Prospectiva API")
+    ap.add_argument("--host", default=env("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(env("PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--stateless", action="store_true",
+                    help="allow --workers > 1 although sessions are not shared between workers")
+    ap.add_argument("--loop", default=env("SERVER_LOOP", "uvloop"), choices=["auto", "asyncio", "uvloop"])
+    ap.add_argument("--http", default=env("SERVER_HTTP", "httptools"), choices=["auto", "h11", "httptools"])
+    ap.add_argument("--keep-alive", type=int, default=int(env("SERVER_KEEPALIVE", "15")))
+    ap.add_argument("--backlog", type=int, default=int(env("SERVER_BACKLOG", "2048")))
+    ap.add_argument("--log-level", default=env("LOG_LEVEL", "info"))
+    return ap.parse_args(argv)
+
+
+def load_app():
+    from main import app
+
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def run_single(args):
+    import uvicorn
+
+    uvicorn.run(
+        load_app(),
+        host=args.host,
+        port=args.port,
+        loop=args.loop,
+        http=args.http,
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        log_level=args.log_level,
+    )
+
+
+def run_preforked(args):
+    from gunicorn.app.base import BaseApplication
+    from uvicorn_worker import UvicornWorker
+
+    class Worker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": args.loop, "http": args.http}
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", Worker)
+            self.cfg.set("keepalive", args.keep_alive)
+            self.cfg.set("backlog", args.backlog)
+            self.cfg.set("loglevel", args.log_level)
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            return application
+
+    application = load_app()
+    Server().run()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers > 1:
+        if not args.stateless:
+            sys.exit(
+                f"serve.py: refusing --workers {args.workers}: sessions live in each worker's memory, "
+                "so reports would 404 on the other workers. Use cluster mode (one NODE_ID and port "
+                "per process) or pass --stateless if no request needs a session."
+            )
+        print(f"serve.py: {args.workers} workers do not share sessions (--stateless)", file=sys.stderr)
+        run_preforked(args)
+    else:
+        run_single(args)
+
+
+if __name__ == "__main__":
+    main()
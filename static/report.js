@@ -0,0 +1,277 @@
+// COLUMNAR DECODER (inverse of formats.to_columnar in the API)
+function decodeColumnar(p) {
+  if (!p || p.format !== 'columnar') return p;
+  const t = p.noticias, S = t.strings, enc = new Set(t.encoded);
+  const out = new Array(t.length);
+  for (let i = 0; i < t.length; i++) out[i] = {};
+  for (const f of t.fields) {
+    const col = t.columns[f], d = enc.has(f);
+    for (let i = 0; i < t.length; i++) {
+      const v = col[i];
+      if (v !== null) out[i][f] = d ? S[v] : v;
+    }
+  }
+  const r = Object.assign({}, p, {noticias: out});
+  delete r.format;
+  return r;
+}
+
+// Per-session data comes from the JSON block in the page shell.
+const REPORT = JSON.parse(document.getElementById('report').textContent);
+const SESSION_ID = REPORT.session_id;
+const RAW = decodeColumnar(REPORT.data);
+const noticias = RAW.noticias || [];
+const meta = RAW.metadata || {};
+
+// Variable tag
+(function() {
+  const el = document.getElementById('varTag');
+  const v = REPORT.variable;
+  if (v) el.textContent = v; else el.style.display = 'none';
+})();
+
+// STATS
+function computeStats() {
+  const counts = {H1:0, H2:0, H3:0};
+  noticias.forEach(n => {
+    const h = (n.Hipotesis||n.hipotesis||'').toUpperCase();
+    if (counts[h] !== undefined) counts[h]++;
+  });
+  const srcs = new Set(noticias.map(n => n.Fuente||n.fuente).filter(Boolean)).size;
+  return {total: noticias.length, ...counts, sources: srcs};
+}
+
+function renderStats(st) {
+  const bar = document.getElementById('statsBar');
+  bar.innerHTML = '';
+  [[st.total,'Total Noticias'],[st.H1,'Hipótesis 1'],
+   [st.H2,'Hipótesis 2'],[st.H3,'Hipótesis 3'],[st.sources,'Fuentes']].forEach(([n,l]) => {
+    const d = document.createElement('div');
+    d.className = 'stat';
+    d.innerHTML = `<div class="stat-num">${n}</div><div class="stat-label">${l}</div>`;
+    bar.appendChild(d);
+  });
+}
+renderStats(computeStats());
+
+// CARD
+// Item text comes from report payloads and live appends: always escaped.
+function esc(s) {
+  return String(s||'').replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;')
+    .replace(/"/g,'&quot;').replace(/'/g,'&#39;');
+}
+
+function card(n, i) {
+  const hyp = esc(String(n.Hipotesis||n.hipotesis||'').toUpperCase());
+  const hc = hyp==='H1'?'h1':hyp==='H2'?'h2':'h3';
+  const title = esc(n['Hecho/Titular']||n.titulo||'—');
+  const source = esc(n.Fuente||n.fuente||'—');
+  const date = esc(n.Fecha||n.fecha||'—');
+  const country = esc(n.País||n.pais||'—');
+  const precursor = esc(n['Hecho precursor']||n.precursor||'');
+  const url = String(n.Enlace||n.enlace||'');
+  const link = /^https?:\/\//i.test(url) ? esc(url) : '#';
+  const host = esc((n._link && n._link.host) || '');
+  const delay = Math.min(i*0.04, 0.6);
+  return `
+  <div class="card ${hc}" style="animation-delay:${delay}s"
+       data-hyp="${hyp}">
+    <div class="card-stripe"></div>
+    <div class="card-body">
+      <div class="card-top">
+        <span class="hyp-badge ${hc}">${hyp||'—'}</span>
+        ${n._nuevo ? '<span class="new-badge">Nueva</span>' : ''}
+        <span class="source-chip">${source}</span>
+      </div>
+      <div class="card-title">${title}</div>
+      ${precursor ? `
+      <div class="precursor-block">
+        <div class="precursor-label">⚡ Hecho Precursor</div>
+        <div class="precursor-text">${precursor}</div>
+      </div>` : ''}
+    </div>
+    <div class="card-footer">
+      <div class="meta-row">
+        <span class="meta-chip">📅 ${date}</span>
+        <span class="meta-chip">🌍 ${country}</span>
+        ${host ? `<span class="meta-chip">🔗 ${host}</span>` : ''}
+      </div>
+      ${link!=='#'?`<a class="card-link" href="${link}" target="_blank" rel="noopener">Ver nota →</a>`:''}
+    </div>
+  </div>`;
+}
+
+function render(list) {
+  const grid = document.getElementById('grid');
+  if (!list.length) {
+    grid.innerHTML = '<div class="empty">No se encontraron noticias con ese criterio.</div>';
+    return;
+  }
+  grid.innerHTML = list.map((n,i) => card(n,i)).join('');
+}
+
+// FILTER + SEARCH
+// Matching runs in a worker over search strings folded once per item; this
+// thread only posts queries and renders the id lists that come back.
+let activeFilter = 'all', searchTerm = '', querySeq = 0, searchTimer = null;
+const newIds = [];
+
+function searchEntry(n) {
+  return {
+    hyp: (n.Hipotesis||n.hipotesis||'').toUpperCase(),
+    text: [n['Hecho/Titular']||n.titulo, n.Fuente||n.fuente,
+           n.País||n.pais, n['Hecho precursor']||n.precursor].join('\n'),
+  };
+}
+
+let searchWorker = null;
+try {
+  searchWorker = new Worker('/static/search-worker.js');
+  searchWorker.onmessage = e => {
+    if (e.data.seq === querySeq) render(e.data.ids.map(i => noticias[i]));
+  };
+  searchWorker.onerror = () => { searchWorker = null; applyFilters(); };
+} catch (err) {
+  searchWorker = null;
+}
+
+function searchLoad() {
+  if (searchWorker) searchWorker.postMessage({type: 'load', items: noticias.map(searchEntry)});
+}
+function searchAppend(items) {
+  if (searchWorker) searchWorker.postMessage({type: 'append', items: items.map(searchEntry)});
+}
+function searchMark(ids) {
+  newIds.push(...ids);
+  if (searchWorker) searchWorker.postMessage({type: 'mark', ids});
+}
+searchLoad();
+
+function applyFilters() {
+  const seq = ++querySeq;
+  if (searchWorker) {
+    searchWorker.postMessage({type: 'query', seq, hyp: activeFilter, q: searchTerm});
+    return;
+  }
+  // No worker: same matching, on this thread.
+  let r = noticias;
+  if (activeFilter === 'new')
+    r = r.filter(n => n._nuevo);
+  else if (activeFilter !== 'all')
+    r = r.filter(n => (n.Hipotesis||n.hipotesis||'').toUpperCase() === activeFilter);
+  if (searchTerm) {
+    const fold = t => t.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '');
+    const q = fold(searchTerm);
+    r = r.filter(n => fold(searchEntry(n).text).includes(q));
+  }
+  render(r);
+}
+
+document.querySelector('.toolbar').addEventListener('click', e => {
+  if (!e.target.matches('.filter-btn')) return;
+  document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
+  e.target.classList.add('active');
+  activeFilter = e.target.dataset.filter;
+  applyFilters();
+});
+
+document.getElementById('searchInput').addEventListener('input', e => {
+  searchTerm = e.target.value.trim();
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(applyFilters, 150);
+});
+
+// EXCEL EXPORT
+// SheetJS is large and only needed on click, so it is loaded on demand.
+const XLSX_URL = 'https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js';
+
+function loadXLSX() {
+  if (window.XLSX) return Promise.resolve(window.XLSX);
+  return new Promise((resolve, reject) => {
+    const sc = document.createElement('script');
+    sc.src = XLSX_URL;
+    sc.onload = () => resolve(window.XLSX);
+    sc.onerror = reject;
+    document.head.appendChild(sc);
+  });
+}
+
+document.getElementById('btnExcel').addEventListener('click', () => {
+  loadXLSX().then(exportExcel, () => alert('No se pudo cargar el exportador de Excel.'));
+});
+
+function exportExcel(XLSX) {
+  const rows = noticias.map(n => ({
+    'Hipótesis':       n.Hipotesis||n.hipotesis||'',
+    'Hecho/Titular':   n['Hecho/Titular']||n.titulo||'',
+    'Hecho Precursor': n['Hecho precursor']||n.precursor||'',
+    'Fecha':           n.Fecha||n.fecha||'',
+    'Fuente':          n.Fuente||n.fuente||'',
+    'País':            n.País||n.pais||'',
+    'Enlace':          n.Enlace||n.enlace||'',
+  }));
+  const ws = XLSX.utils.json_to_sheet(rows);
+  ws['!cols'] = [{wch:8},{wch:62},{wch:55},{wch:13},{wch:14},{wch:20},{wch:60}];
+  const wb = XLSX.utils.book_new();
+  XLSX.utils.book_append_sheet(wb, ws, 'Noticias');
+  const d = `${REPORT.start}_al_${REPORT.end}`.replace(/-/g,'');
+  XLSX.writeFile(wb, `Vigilancia_Prospectiva_${d}.xlsx`);
+}
+
+// FOOTER
+(function() {
+  const gen = meta.generated_at ? new Date(meta.generated_at).toLocaleString('es-PE') : '—';
+  const errors = meta.stats?.errors ?? 0;
+  document.getElementById('footer').innerHTML =
+    `CEPLAN — Centro Nacional de Planeamiento Estratégico &nbsp;|&nbsp;
+     Generado: ${esc(gen)} &nbsp;|&nbsp; Modelo: ${esc(meta.model||'—')} &nbsp;|&nbsp;
+     ${esc(meta.total_news||noticias.length)} noticias procesadas
+     ${errors>0 ? ' &nbsp;|&nbsp; ⚠️ '+esc(errors)+' errores' : ''} &nbsp;|&nbsp; Sesión válida 24h`;
+})();
+
+render(noticias);
+
+// NEW SINCE A PREVIOUS REPORT (?since=<session_id>)
+(function() {
+  const since = new URLSearchParams(location.search).get('since');
+  if (!since) return;
+  fetch('/diff/' + encodeURIComponent(since) + '/' + SESSION_ID)
+    .then(r => r.ok ? r.json() : null)
+    .then(d => {
+      if (!d) return;
+      d.added.forEach(i => { if (noticias[i]) noticias[i]._nuevo = true; });
+      searchMark(d.added);
+      const b = document.createElement('button');
+      b.className = 'filter-btn new';
+      b.dataset.filter = 'new';
+      b.textContent = `Nuevas (${d.added.length})`;
+      document.querySelector('.filter-group').appendChild(b);
+      applyFilters();
+    });
+})();
+
+// LIVE UPDATES
+(function() {
+  if (!window.EventSource) return;
+  const es = new EventSource('/stream/' + SESSION_ID);
+  es.addEventListener('items', e => {
+    const msg = JSON.parse(e.data);
+    noticias.push(...msg.noticias);
+    searchAppend(msg.noticias);
+    renderStats(msg.stats);
+    applyFilters();
+  });
+  es.addEventListener('closed', () => es.close());
+  es.addEventListener('reset', () => {
+    fetch('/data/' + SESSION_ID + '?format=columnar')
+      .then(r => r.json())
+      .then(p => {
+        noticias.splice(0, noticias.length, ...(decodeColumnar(p).noticias || []));
+        newIds.forEach(i => { if (noticias[i]) noticias[i]._nuevo = true; });
+        searchLoad();
+        if (searchWorker) searchWorker.postMessage({type: 'mark', ids: newIds});
+        renderStats(computeStats());
+        applyFilters();
+      });
+  });
+})();
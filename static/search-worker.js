@@ -0,0 +1,46 @@
+// Search worker for the report view.
+// Keeps one folded (lowercase, accent-free) search string per item and
+// answers queries with lists of matching item ids, so the UI thread never
+// scans or lowercases item text.
+
+let hyps = [], texts = [], isNew = [];
+let pending = null;
+
+function fold(s) {
+  return String(s || '').toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '');
+}
+
+function add(items) {
+  for (const it of items) {
+    hyps.push(it.hyp);
+    texts.push(fold(it.text));
+    isNew.push(false);
+  }
+}
+
+function run(msg) {
+  const q = fold(msg.q).trim();
+  const hyp = msg.hyp;
+  const ids = [];
+  for (let i = 0; i < texts.length; i++) {
+    if (hyp === 'new') { if (!isNew[i]) continue; }
+    else if (hyp !== 'all' && hyps[i] !== hyp) continue;
+    if (q && !texts[i].includes(q)) continue;
+    ids.push(i);
+  }
+  postMessage({seq: msg.seq, ids});
+}
+
+onmessage = e => {
+  const msg = e.data;
+  if (msg.type === 'load') { hyps = []; texts = []; isNew = []; add(msg.items); }
+  else if (msg.type === 'append') add(msg.items);
+  else if (msg.type === 'mark') msg.ids.forEach(i => { if (i < isNew.length) isNew[i] = true; });
+  else if (msg.type === 'query') {
+    // Only the latest query queued before the next tick runs; older ones
+    // are dropped as stale.
+    const first = pending === null;
+    pending = msg;
+    if (first) setTimeout(() => { const m = pending; pending = null; run(m); }, 0);
+  }
+};
@@ -0,0 +1,398 @@
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import itempool
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SESSION_TTL_HOURS = 24
+
+# Sessions untouched for HOT_IDLE_SECONDS are compacted into compressed JSON
+# bytes ("cold" tier) and inflated again on the next access.
+HOT_IDLE_SECONDS = int(os.environ.get("STORE_HOT_IDLE_SECONDS", "3600"))
+CODEC = os.environ.get("STORE_CODEC", "zlib")
+LEVEL = int(os.environ.get("STORE_LEVEL", "6"))
+# Compaction runs in the background at most this often, never inline.
+COMPACT_INTERVAL_SECONDS = int(os.environ.get("STORE_COMPACT_INTERVAL_SECONDS", "60"))
+
+if CODEC == "zstd" and zstandard is None:
+    CODEC = "zlib"
+
+SHARDS = int(os.environ.get("STORE_SHARDS", "16"))
+
+
+class ShardedSessions:
+    """Session records split over shards, each with its own lock.
+
+    Single-key reads (get, in, []) are one dict lookup, atomic under the
+    GIL, so they take no lock. Writes lock only the key's shard, and
+    iteration works on per-shard snapshots, so concurrent handlers can
+    insert, expire and list sessions without "dictionary changed size
+    during iteration" errors or lost inserts.
+    """
+
+    def __init__(self, shards=SHARDS):
+        self._shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key, default=None):
+        return self._shard(key)[0].get(key, default)
+
+    def __contains__(self, key):
+        return key in self._shard(key)[0]
+
+    def __getitem__(self, key):
+        return self._shard(key)[0][key]
+
+    def __setitem__(self, key, value):
+        d, lock = self._shard(key)
+        with lock:
+            d[key] = value
+
+    def pop(self, key, default=None):
+        d, lock = self._shard(key)
+        with lock:
+            return d.pop(key, default)
+
+    def __len__(self):
+        return sum(len(d) for d, _ in self._shards)
+
+    def items(self):
+        out = []
+        for d, lock in self._shards:
+            with lock:
+                out.extend(d.items())
+        return out
+
+    def keys(self):
+        return [k for k, _ in self.items()]
+
+    def values(self):
+        return [v for _, v in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def pop_expired(self, now):
+        """Remove and return (id, record) for records whose expiry is before now."""
+        expired = []
+        for d, lock in self._shards:
+            with lock:
+                dead = [(k, v) for k, v in d.items() if v["expires"] < now]
+                for k, _ in dead:
+                    del d[k]
+            expired.extend(dead)
+        return expired
+
+    def lock_for(self, key):
+        return self._shard(key)[1]
+
+
+sessions = ShardedSessions()
+
+# Hit/miss counters are updated without a lock and may undercount slightly
+# under concurrency; they are for monitoring only.
+_stats = {
+    "hot": {"hits": 0, "misses": 0},
+    "cold": {"hits": 0, "misses": 0, "compactions": 0, "decompress_ms_total": 0.0, "decompress_ms_max": 0.0},
+}
+
+
+def _compress(raw):
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=LEVEL).compress(raw)
+    return zlib.compress(raw, LEVEL)
+
+
+def _decompress(blob, codec):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def _thaw(s):
+    if s.get("packed") is None:
+        return s["data"]
+    return json.loads(_decompress(s["packed"], s["codec"]))
+
+
+def _count_items(data):
+    items = data.get("noticias") if isinstance(data, dict) else None
+    return len(items) if isinstance(items, list) else 0
+
+
+def _release(s):
+    if s.get("item_keys"):
+        itempool.pool.release(s["item_keys"])
+
+
+def put(session_id, record):
+    now = time.time()
+    old = sessions.get(session_id)
+    sessions[session_id] = {
+        **record,
+        "created": record.get("created", now),
+        "views": record.get("views", 0),
+        "items": _count_items(record["data"]),
+        "item_keys": None,  # set by intern(), run as the first job stage
+        "json_bytes": None,
+        "last_access": now,
+        "packed": None,
+    }
+    if old is not None:
+        _release(old)
+
+
+def add_items(session_id, s, items):
+    """Append items to a session (pooled like intern) and return what was stored."""
+    keys = None
+    if itempool.ENABLED:
+        items, keys = itempool.pool.acquire(items)
+    with sessions.lock_for(session_id):
+        data = s["data"]
+        if not isinstance(data.get("noticias"), list):
+            data["noticias"] = []
+        if keys is not None:
+            _track(s)
+            s["item_keys"] += keys
+        data["noticias"].extend(items)
+        modified(s)
+    return items
+
+
+def _track(s):
+    # Items not pooled yet get zero keys, which intern() fills in later.
+    if s.get("item_keys") is None:
+        s["item_keys"] = bytearray(itempool.KEY_BYTES * _count_items(s["data"]))
+
+
+def intern(session_id):
+    """Swap a session's unpooled items for shared pooled dicts (see itempool).
+
+    Hashing every item is too slow for the request thread, so this runs as
+    the first job stage; until then the session holds its own dicts.
+    Hashing happens outside the shard lock; an item replaced meanwhile
+    keeps its own dict and its pool reference is dropped.
+    """
+    if not itempool.ENABLED:
+        return
+    s = get(session_id)
+    if s is None:
+        return
+    items = s["data"].get("noticias")
+    if not isinstance(items, list):
+        return
+    empty = bytes(itempool.KEY_BYTES)
+    keys = s.get("item_keys")
+    todo = [
+        i for i, n in enumerate(list(items))
+        if isinstance(n, dict) and (keys is None or keys[i * itempool.KEY_BYTES:(i + 1) * itempool.KEY_BYTES] == empty)
+    ]
+    originals = [items[i] for i in todo]
+    pooled, new_keys = itempool.pool.acquire(originals)
+    unused = bytearray()
+    with sessions.lock_for(session_id):
+        live = s["data"] is not None and s["data"].get("noticias") is items
+        if live:
+            _track(s)
+        keys = s.get("item_keys")
+        for j, i in enumerate(todo):
+            key = new_keys[j * itempool.KEY_BYTES:(j + 1) * itempool.KEY_BYTES]
+            at = slice(i * itempool.KEY_BYTES, (i + 1) * itempool.KEY_BYTES)
+            if live and items[i] is originals[j] and keys[at] == empty:
+                items[i] = pooled[j]
+                keys[at] = key
+            else:
+                unused += key
+    itempool.pool.release(unused)
+
+
+def replace_items(session_id, updates):
+    """Swap items by position ({index: new item}); returns the record or None.
+
+    The old dicts are never mutated, since the pool may share them with
+    other sessions and readers may be serialising them. New items are
+    pooled in turn and the old ones released.
+    """
+    while True:
+        s = get(session_id)
+        if s is None:
+            return None
+        with sessions.lock_for(session_id):
+            if s["packed"] is None:  # not compacted again since get()
+                _replace(s, updates)
+                return s
+
+
+def _replace(s, updates):
+    items = s["data"]["noticias"]
+    keys = s.get("item_keys")
+    idx = [i for i in sorted(updates) if i < len(items)]
+    new = [updates[i] for i in idx]
+    if itempool.ENABLED and keys is not None:
+        new, new_keys = itempool.pool.acquire(new)
+        old = bytearray()
+        for j, i in enumerate(idx):
+            at = slice(i * itempool.KEY_BYTES, (i + 1) * itempool.KEY_BYTES)
+            old += keys[at]
+            keys[at] = new_keys[j * itempool.KEY_BYTES:(j + 1) * itempool.KEY_BYTES]
+        itempool.pool.release(old)
+    for i, n in zip(idx, new):
+        items[i] = n
+    modified(s)
+
+
+def modified(s):
+    """Refresh derived bookkeeping after a session's data changed in place."""
+    s["items"] = _count_items(s["data"])
+    s["json_bytes"] = None
+
+
+def evict(session_id):
+    s = sessions.pop(session_id, None)
+    if s is None:
+        return False
+    _release(s)
+    return True
+
+
+def describe(session_id, now=None):
+    s = sessions.get(session_id)
+    if s is None:
+        return None
+    now = now or time.time()
+    if s["json_bytes"] is None and s["packed"] is None:
+        s["json_bytes"] = len(json.dumps(s["data"], ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    cold = s["packed"] is not None
+    return {
+        "session_id": session_id,
+        "tier": "cold" if cold else "hot",
+        "items": s["items"],
+        "bytes": len(s["packed"]) if cold else s["json_bytes"],
+        "json_bytes": s["json_bytes"],
+        "age_seconds": round(now - s["created"]),
+        "idle_seconds": round(now - s["last_access"]),
+        "last_access": datetime.utcfromtimestamp(s["last_access"]).isoformat() + "Z",
+        "views": s["views"],
+        "variable": s["variable"],
+        "expires": s["expires"].isoformat() + "Z",
+    }
+
+
+def contains(session_id):
+    """True if the session exists and has not expired (same rule as get)."""
+    s = sessions.get(session_id)
+    return s is not None and s["expires"] >= datetime.utcnow()
+
+
+def ids():
+    return sessions.keys()
+
+
+def get(session_id):
+    """Return the session record with its data inflated, or None if unknown."""
+    s = sessions.get(session_id)
+    if s is None or s["expires"] < datetime.utcnow():
+        _stats["hot"]["misses"] += 1
+        _stats["cold"]["misses"] += 1
+        return None
+    s["last_access"] = time.time()
+    if s["packed"] is None:
+        _stats["hot"]["hits"] += 1
+        return s
+    _stats["hot"]["misses"] += 1
+    with sessions.lock_for(session_id):
+        if s["packed"] is None:  # thawed by another thread meanwhile
+            return s
+        t0 = time.perf_counter()
+        data = _thaw(s)
+        if itempool.ENABLED and isinstance(data.get("noticias"), list):
+            # Compaction released the session's references; take them again.
+            data["noticias"], s["item_keys"] = itempool.pool.acquire(data["noticias"])
+        s["data"] = data
+        ms = (time.perf_counter() - t0) * 1000
+        s["packed"] = None
+    cold = _stats["cold"]
+    cold["hits"] += 1
+    cold["decompress_ms_total"] += ms
+    cold["decompress_ms_max"] = max(cold["decompress_ms_max"], ms)
+    return s
+
+
+def export(session_id):
+    s = sessions[session_id]
+    return {k: v for k, v in s.items() if k not in ("packed", "codec", "item_keys")} | {"data": _thaw(s)}
+
+
+def compact_idle(now=None):
+    cutoff = (now or time.time()) - HOT_IDLE_SECONDS
+    for session_id, s in sessions.items():
+        if s["packed"] is not None or s["last_access"] >= cutoff:
+            continue
+        with sessions.lock_for(session_id):
+            if s["packed"] is not None or s["last_access"] >= cutoff:
+                continue
+            raw = json.dumps(s["data"], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            s["packed"], s["codec"], s["data"] = _compress(raw), CODEC, None
+            s["json_bytes"] = len(raw)
+            # The packed copy holds its own items, so the pooled ones can go.
+            keys, s["item_keys"] = s.get("item_keys"), None
+        if keys:
+            itempool.pool.release(keys)
+        _stats["cold"]["compactions"] += 1
+
+
+_compact_lock = threading.Lock()
+_compact_next = 0.0
+
+
+def compaction_due(now=None):
+    """True at most once per COMPACT_INTERVAL_SECONDS, and never while one runs."""
+    global _compact_next
+    now = now or time.time()
+    if now < _compact_next or not _compact_lock.acquire(blocking=False):
+        return False
+    _compact_next = now + COMPACT_INTERVAL_SECONDS
+    return True
+
+
+def compact_scheduled():
+    """compact_idle() for a run claimed with compaction_due()."""
+    try:
+        compact_idle()
+    finally:
+        _compact_lock.release()
+
+
+def cleanup():
+    """Drop expired sessions (cheap: no compression); returns their ids."""
+    expired = sessions.pop_expired(datetime.utcnow())
+    for _, s in expired:
+        _release(s)
+    return [session_id for session_id, _ in expired]
+
+
+def stats():
+    cold_sessions = [s for s in sessions.values() if s["packed"] is not None]
+    cold = _stats["cold"]
+    return {
+        "codec": CODEC,
+        "level": LEVEL,
+        "hot_idle_seconds": HOT_IDLE_SECONDS,
+        "hot": {**_stats["hot"], "sessions": len(sessions) - len(cold_sessions)},
+        "cold": {
+            **cold,
+            "sessions": len(cold_sessions),
+            "bytes": sum(len(s["packed"]) for s in cold_sessions),
+            "decompress_ms_avg": cold["decompress_ms_total"] / cold["hits"] if cold["hits"] else 0.0,
+        },
+    }
@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import Counter
+
+try:
+    import numpy as np
+    import scipy.sparse as sp
+except ImportError:
+    np = sp = None
+
+import news
+from trends import TEXT_FIELDS, tokens
+
+ENABLED = os.environ.get("TOPICS", "") == "1" and sp is not None
+K = int(os.environ.get("TOPICS_K", "0"))  # 0 = sqrt(n/2), between 2 and 64
+MAX_FEATURES = int(os.environ.get("TOPICS_MAX_FEATURES", "16384"))
+RELATED = int(os.environ.get("TOPICS_RELATED", "5"))
+MIN_SIMILARITY = float(os.environ.get("TOPICS_MIN_SIMILARITY", "0.2"))
+BATCH = 1024
+SEED = 7
+LABEL_TERMS = 4
+# Upper bound on the dense similarity block computed at once (floats).
+BLOCK = 1 << 22
+
+
+def item_terms(n):
+    if not isinstance(n, dict):
+        return []
+    out = []
+    for field in TEXT_FIELDS:
+        text = news.get(n, field)
+        if isinstance(text, str):
+            out.extend(tokens(text)[0])
+    return out
+
+
+def _normalize_rows(X):
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    X.data /= np.repeat(norms, np.diff(X.indptr)).astype(X.dtype)
+    return X
+
+
+class TopicModel:
+    """TF-IDF vocabulary plus spherical k-means centers for one session.
+
+    Holds each item's label and related items, by position; they are
+    merged into responses (see labelled) rather than written into the
+    items, which may be pooled and shared with other sessions.
+    """
+
+    def __init__(self, vocab, idf, centers, terms):
+        self.vocab = vocab
+        self.idf = idf
+        self.centers = centers
+        self.terms = terms
+        self.labels = np.empty(0, dtype=np.int32)
+        self.related = []
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return len(self.labels)
+
+    @classmethod
+    def fit(cls, docs):
+        n = len(docs)
+        df = Counter()
+        for d in docs:
+            df.update(set(d))
+        min_df = 2 if n >= 50 else 1
+        kept = [(c, t) for t, c in df.items() if c >= min_df and (c <= n // 2 or n < 50)]
+        kept.sort(key=lambda ct: (-ct[0], ct[1]))
+        terms = [t for _, t in kept[:MAX_FEATURES]]
+        vocab = {t: i for i, t in enumerate(terms)}
+        dfs = np.array([df[t] for t in terms], dtype=np.float32)
+        idf = (np.log((1 + n) / (1 + dfs)) + 1).astype(np.float32)
+        model = cls(vocab, idf, None, np.array(terms, dtype=object))
+        X = model.vectorize(docs)
+        model.centers = kmeans(X, K or max(2, min(64, round((n / 2) ** 0.5))))
+        return model, X
+
+    def vectorize(self, docs):
+        """Rows of L2-normalised sublinear TF-IDF, as CSR."""
+        rows, cols = [], []
+        vocab = self.vocab
+        for i, d in enumerate(docs):
+            for t in d:
+                j = vocab.get(t)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+        X = sp.csr_matrix(
+            (np.ones(len(cols), dtype=np.float32), (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+            shape=(len(docs), len(vocab)),
+        )
+        X.sum_duplicates()
+        X.data = (1 + np.log(X.data)) * self.idf[X.indices]
+        return _normalize_rows(X)
+
+    def assign(self, X):
+        """Nearest center per row; -1 for rows with no known terms."""
+        labels = np.full(X.shape[0], -1, dtype=np.int32)
+        if self.centers is None or not X.shape[0]:
+            return labels
+        step = max(1, BLOCK // max(1, len(self.centers)))
+        for lo in range(0, X.shape[0], step):
+            block = X[lo:lo + step]
+            sims = np.asarray(block @ self.centers.T)
+            labels[lo:lo + step] = np.where(np.diff(block.indptr) > 0, sims.argmax(axis=1), -1)
+        return labels
+
+    def extend(self, items):
+        """Label appended items with the existing centers (no refit)."""
+        new = self.assign(self.vectorize([item_terms(n) for n in items]))
+        with self._lock:
+            self.labels = np.concatenate([self.labels, new])
+        return new
+
+    def topics(self):
+        """Clusters by size, labelled with their heaviest terms."""
+        if self.centers is None:
+            return []
+        labels = self.labels
+        sizes = np.bincount(labels[labels >= 0], minlength=len(self.centers))
+        out = []
+        for j in np.argsort(-sizes, kind="stable"):
+            if sizes[j] == 0:
+                continue
+            top = np.argsort(-self.centers[j])[:LABEL_TERMS]
+            words = [str(self.terms[t]) for t in top if self.centers[j, t] > 0]
+            out.append({"id": int(j), "label": " · ".join(words), "terms": words, "size": int(sizes[j])})
+        return out
+
+
+def kmeans(X, k, iters=None):
+    """Mini-batch spherical k-means (Sculley 2010) on L2-normalised rows."""
+    rng = np.random.default_rng(SEED)
+    live = np.flatnonzero(np.diff(X.indptr) > 0)
+    k = min(k, len(live))
+    if k == 0:
+        return None
+    centers = X[rng.choice(live, size=k, replace=False)].toarray()
+    counts = np.zeros(k, dtype=np.float32)
+    iters = iters or min(300, max(30, 3 * len(live) // BATCH))
+    for _ in range(iters):
+        idx = rng.choice(live, size=min(BATCH, len(live)), replace=False)
+        Xb = X[idx]
+        labels = np.asarray(Xb @ centers.T).argmax(axis=1)
+        onehot = sp.csr_matrix(
+            (np.ones(len(idx), dtype=np.float32), (labels, np.arange(len(idx)))), shape=(k, len(idx))
+        )
+        sums = (onehot @ Xb).toarray()
+        m = np.bincount(labels, minlength=k).astype(np.float32)
+        counts += m
+        hit = m > 0
+        centers[hit] += (sums[hit] - m[hit, None] * centers[hit]) / counts[hit, None]
+        norms = np.linalg.norm(centers, axis=1)
+        norms[norms == 0] = 1
+        centers /= norms[:, None]
+    return centers
+
+
+def related(X, labels, limit=RELATED, threshold=MIN_SIMILARITY):
+    """Most similar items within each item's cluster, by cosine similarity."""
+    out = [[] for _ in range(X.shape[0])]
+    if limit <= 0:
+        return out
+    for j in np.unique(labels[labels >= 0]):
+        members = np.flatnonzero(labels == j)
+        if len(members) < 2:
+            continue
+        Xc = X[members]
+        XcT = Xc.T.tocsr()
+        step = max(1, BLOCK // len(members))
+        take = min(limit, len(members) - 1)
+        for lo in range(0, len(members), step):
+            sims = (Xc[lo:lo + step] @ XcT).toarray()
+            rows = np.arange(sims.shape[0])
+            sims[rows, rows + lo] = -1  # not related to itself
+            top = np.argpartition(-sims, take - 1, axis=1)[:, :take]
+            top_sims = sims[rows[:, None], top]
+            order = np.argsort(-top_sims, axis=1)
+            top, top_sims = np.take_along_axis(top, order, 1), np.take_along_axis(top_sims, order, 1)
+            for r in rows:
+                out[members[lo + r]] = [int(members[c]) for c, s in zip(top[r], top_sims[r]) if s >= threshold]
+    return out
+
+
+models = {}
+
+
+def build(session_id, items):
+    """Fit a model for the items, with each item's label and related items."""
+    model, X = TopicModel.fit([item_terms(n) for n in items])
+    model.labels = model.assign(X)
+    model.related = related(X, model.labels)
+    models[session_id] = model
+    return model
+
+
+def labelled(session_id, items, ids=None):
+    """items (or items[i] for i in ids) with _topic and _related added.
+
+    Items the session's model has not labelled, and every item when there
+    is no model, are returned as they are. Appended items have no _related.
+    """
+    ids = range(len(items)) if ids is None else ids
+    model = models.get(session_id)
+    if model is None:
+        return [items[i] for i in ids]
+    with model._lock:
+        labels, rel = model.labels.tolist(), model.related
+    out = []
+    for i in ids:
+        n = items[i]
+        if isinstance(n, dict) and i < len(labels):
+            n = {**n, "_topic": labels[i], "_related": rel[i] if i < len(rel) else []}
+        out.append(n)
+    return out
+
+
+def annotate(session_id, data):
+    """data with labelled items and the session's _topics, for responses."""
+    model = models.get(session_id)
+    items = data.get("noticias") if isinstance(data, dict) else None
+    if model is None or not isinstance(items, list):
+        return data
+    return {**data, "noticias": labelled(session_id, items), "_topics": model.topics()}
+
+
+def drop(session_id):
+    models.pop(session_id, None)
@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from contextlib import ExitStack
+
+import news
+
+K = int(os.environ.get("TRENDS_K", "200"))
+
+GROUPS = ("H1", "H2", "H3")
+TEXT_FIELDS = ("title", "precursor")
+TOKEN = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes aquel aquella aquellas aquellos aqui aquí así asi aun aún
+bajo bien cada casi como cómo con contra cual cuál cuales cuando cuándo de del desde donde
+dónde dos durante e el él ella ellas ellos en entre era eran es esa esas ese eso esos esta está
+estaba estaban están estar este esto estos fue fueron gran ha había habían han
+hasta hay hace hacen hacia la las le les lo los más mas me mientras mismo muy nada ni no nos
+nuestra nuestro o otra otras otro otros para pero poco por porque que qué quien quién se sea
+según segun ser será serán si sí sido sin sobre son su sus también tambien tan tanto te tiene
+tienen toda todas todo todos tras tu tú un una unas uno unos y ya año años dijo dice
+nuevo nueva nuevos nuevas parte además ademas puede pueden the and for with from
+""".split())
+
+
+class SpaceSaving:
+    """Approximate top-k counter (Metwally et al.) in O(k) memory.
+
+    Each monitored term has a count that overestimates its true frequency by
+    at most `error`. Counts live in buckets so that both increments and
+    evictions of the minimum are O(1).
+    """
+
+    def __init__(self, k=K):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.buckets = {}
+        self.min = 0
+        self.total = 0
+
+    def _move(self, term, old, new):
+        if old:
+            bucket = self.buckets[old]
+            del bucket[term]
+            if not bucket:
+                del self.buckets[old]
+                if old == self.min:
+                    self.min = new
+        self.buckets.setdefault(new, {})[term] = None
+        self.counts[term] = new
+
+    def add(self, term):
+        self.total += 1
+        count = self.counts.get(term)
+        if count is not None:
+            self._move(term, count, count + 1)
+        elif len(self.counts) < self.k:
+            self.errors[term] = 0
+            if not self.counts or self.min > 1:
+                self.min = 1
+            self._move(term, 0, 1)
+        else:
+            floor = self.min
+            victim = next(iter(self.buckets[floor]))
+            del self.counts[victim], self.errors[victim]
+            del self.buckets[floor][victim]
+            if not self.buckets[floor]:
+                del self.buckets[floor]
+            self.buckets.setdefault(floor + 1, {})[term] = None
+            self.counts[term] = floor + 1
+            self.errors[term] = floor
+            if floor not in self.buckets:
+                self.min = floor + 1
+
+    def floor(self):
+        """Upper bound on the count of any term not being monitored."""
+        return self.min if len(self.counts) >= self.k else 0
+
+    def top(self, limit):
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [{"term": t, "count": c, "error": self.errors[t]} for t, c in ranked]
+
+    @classmethod
+    def merge(cls, sketches, k=K):
+        """Combine summaries of disjoint streams into one of size k.
+
+        A term missing from a full summary may still have occurred there up
+        to that summary's floor, which is added to both count and error.
+        """
+        terms = set()
+        for s in sketches:
+            terms.update(s.counts)
+        counts, errors = {}, {}
+        for t in terms:
+            c = e = 0
+            for s in sketches:
+                if t in s.counts:
+                    c += s.counts[t]
+                    e += s.errors[t]
+                else:
+                    c += s.floor()
+                    e += s.floor()
+            counts[t], errors[t] = c, e
+        out = cls(k)
+        out.total = sum(s.total for s in sketches)
+        for t, c in sorted(counts.items(), key=lambda kv: -kv[1])[:k]:
+            out.counts[t] = c
+            out.errors[t] = errors[t]
+            out.buckets.setdefault(c, {})[t] = None
+        out.min = min(out.buckets) if out.buckets else 0
+        return out
+
+
+def tokens(text):
+    words = TOKEN.findall(text.lower())
+    # Numbers, short words and stop words are dropped but still break bigrams.
+    keep = [len(w) > 2 and w.isalpha() and w not in STOPWORDS for w in words]
+    terms = [w for w, ok in zip(words, keep) if ok]
+    bigrams = [f"{a} {b}" for (a, ka), (b, kb) in zip(zip(words, keep), zip(words[1:], keep[1:])) if ka and kb]
+    return terms, bigrams
+
+
+class Trends:
+    """Term and bigram Space-Saving sketches per hypothesis plus overall."""
+
+    def __init__(self, k=K):
+        self.sketches = {
+            g: {"terms": SpaceSaving(k), "bigrams": SpaceSaving(k)} for g in ("all", *GROUPS)
+        }
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def extend(self, items):
+        with self._lock:
+            for n in items:
+                if not isinstance(n, dict):
+                    continue
+                hyp = news.hypothesis(n)
+                targets = [self.sketches["all"]]
+                if hyp in self.sketches:
+                    targets.append(self.sketches[hyp])
+                for field in TEXT_FIELDS:
+                    text = news.get(n, field)
+                    if not isinstance(text, str):
+                        continue
+                    terms, bigrams = tokens(text)
+                    for sk in targets:
+                        for t in terms:
+                            sk["terms"].add(t)
+                        for b in bigrams:
+                            sk["bigrams"].add(b)
+            self.size += len(items)
+
+    def snapshot(self, limit, groups=None):
+        with self._lock:
+            return {
+                g: {kind: sk.top(limit) for kind, sk in kinds.items()}
+                for g, kinds in self.sketches.items()
+                if groups is None or g in groups
+            }
+
+    @classmethod
+    def merge(cls, many):
+        out = cls()
+        with ExitStack() as stack:
+            for t in sorted(set(many), key=id):  # fixed order, no self-deadlock
+                stack.enter_context(t._lock)
+            for g, kinds in out.sketches.items():
+                for kind in kinds:
+                    kinds[kind] = SpaceSaving.merge([t.sketches[g][kind] for t in many])
+            out.size = sum(t.size for t in many)
+        return out
+
+
+trends = {}
+
+
+def build(session_id, items):
+    t = Trends()
+    t.extend(items)
+    trends[session_id] = t
+    return t
+
+
+def drop(session_id):
+    trends.pop(session_id, None)
@@ -0,0 +1,166 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import news
+
+PATH = os.environ.get("WAREHOUSE_PATH", "")
+ENABLED = bool(PATH)
+MAX_ROWS = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    link_hash   TEXT PRIMARY KEY,
+    fecha       TEXT,
+    fecha_raw   TEXT,
+    hipotesis   TEXT,
+    fuente      TEXT,
+    pais        TEXT,
+    variable    TEXT,
+    titular     TEXT,
+    precursor   TEXT,
+    enlace      TEXT,
+    session_id  TEXT,
+    ingested_at REAL
+);
+CREATE INDEX IF NOT EXISTS items_fecha ON items (fecha);
+CREATE INDEX IF NOT EXISTS items_hipotesis ON items (hipotesis, fecha);
+CREATE INDEX IF NOT EXISTS items_fuente ON items (fuente, fecha);
+CREATE INDEX IF NOT EXISTS items_pais ON items (pais, fecha);
+CREATE INDEX IF NOT EXISTS items_variable ON items (variable, fecha);
+"""
+
+FILTERS = ("hipotesis", "fuente", "pais", "variable")
+GROUPS = {
+    "hipotesis": "hipotesis",
+    "fuente": "fuente",
+    "pais": "pais",
+    "variable": "variable",
+    "fecha": "fecha",
+    "month": "substr(fecha, 1, 7)",
+    "year": "substr(fecha, 1, 4)",
+}
+COLUMNS = ("fecha", "hipotesis", "fuente", "pais", "variable", "titular", "precursor", "enlace", "session_id")
+
+_DATE_DMY = re.compile(r"^(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})")
+_DATE_YMD = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+
+_write_lock = threading.Lock()
+_writer = None
+_local = threading.local()
+
+
+def normalize_date(s):
+    s = str(s or "").strip()
+    m = _DATE_YMD.match(s)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    m = _DATE_DMY.match(s)
+    if m:
+        return f"{m.group(3)}-{int(m.group(2)):02d}-{int(m.group(1)):02d}"
+    return None
+
+
+def _connect(readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{PATH}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    return conn
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        _writer = _connect()
+    return _writer
+
+
+def _reader():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        with _write_lock:
+            _get_writer()  # creates the file and schema on first use
+        conn = _local.conn = _connect(readonly=True)
+    return conn
+
+
+def _text(n, field):
+    # Payload fields are usually strings but may be numbers, lists or
+    # objects; sqlite only binds scalars, so everything is stored as text.
+    v = news.get(n, field)
+    return (v if isinstance(v, str) else str(v)) or None
+
+
+def ingest(session_id, variable, items):
+    """Append items, skipping links already stored. Returns rows inserted."""
+    now = time.time()
+    rows = []
+    for n in items:
+        if not isinstance(n, dict):
+            continue
+        fecha_raw = _text(n, "date") or ""
+        rows.append((
+            news.identity(n),
+            normalize_date(fecha_raw),
+            fecha_raw,
+            news.hypothesis(n) or None,
+            _text(n, "source"),
+            _text(n, "country"),
+            str(variable or "") or None,
+            _text(n, "title"),
+            _text(n, "precursor"),
+            _text(n, "link"),
+            session_id,
+            now,
+        ))
+    with _write_lock:
+        conn = _get_writer()
+        before = conn.total_changes
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO items VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+        return conn.total_changes - before
+
+
+def query(filters, start=None, end=None, q=None, group_by=None, limit=100, offset=0):
+    """Filter by exact columns and date range; aggregate if group_by is given."""
+    where, params = [], []
+    for col in FILTERS:
+        if filters.get(col):
+            values = filters[col]
+            where.append(f"{col} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+    if start:
+        where.append("fecha >= ?")
+        params.append(start)
+    if end:
+        where.append("fecha <= ?")
+        params.append(end)
+    if q:
+        where.append("(titular LIKE ? OR precursor LIKE ?)")
+        params.extend([f"%{q}%", f"%{q}%"])
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    limit = max(1, min(int(limit), MAX_ROWS))
+
+    conn = _reader()
+    t0 = time.perf_counter()
+    if group_by:
+        exprs = [GROUPS[g] for g in group_by]
+        sql = (
+            f"SELECT {', '.join(exprs)}, COUNT(*) AS n FROM items{clause} "
+            f"GROUP BY {', '.join(exprs)} ORDER BY n DESC LIMIT ? OFFSET ?"
+        )
+        rows = conn.execute(sql, params + [limit, offset]).fetchall()
+        result = {"groups": [dict(zip(list(group_by) + ["count"], r)) for r in rows]}
+    else:
+        sql = f"SELECT {', '.join(COLUMNS)} FROM items{clause} ORDER BY fecha DESC LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, params + [limit, offset]).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) FROM items{clause}", params).fetchone()[0]
+        result = {"total": total, "rows": [dict(zip(COLUMNS, r)) for r in rows]}
+    result["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return result